@@ -0,0 +1,35 @@
+"""Normalized titles
+
+Revision ID: c47d9e2f1a83
+Revises: 8e3f1a6c2b57
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c47d9e2f1a83"
+down_revision: Union[str, Sequence[str], None] = "8e3f1a6c2b57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("paper_records", sa.Column("normalized_title", sa.Text(), nullable=True))
+    # same as arxiv_at_home.common.dto.normalize_title
+    op.execute(
+        "UPDATE paper_records "
+        "SET normalized_title = btrim(regexp_replace(lower(paper_metadata->>'title'), '[^a-z0-9]+', ' ', 'g'))"
+    )
+    op.create_index("idx_papers_normalized_title", "paper_records", ["normalized_title"], unique=False, postgresql_ops={"normalized_title": "text_pattern_ops"})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_papers_normalized_title", table_name="paper_records", postgresql_ops={"normalized_title": "text_pattern_ops"})
+    op.drop_column("paper_records", "normalized_title")
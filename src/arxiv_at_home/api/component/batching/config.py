@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class MicroBatchingConfig(BaseModel):
+    # how long the scheduler waits for more requests after the first one arrives
+    max_wait_ms: float = 2.0
+    max_batch_size: int = 64
+    # upper bound for padded batch size, i.e. max_sequence_length * batch_size
+    max_batch_tokens: int = 32768
@@ -0,0 +1,178 @@
+import asyncio
+import dataclasses
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generic, TypeVar
+
+from arxiv_at_home.api.component.batching.config import MicroBatchingConfig
+
+TItem = TypeVar("TItem")
+TResult = TypeVar("TResult")
+
+
+@dataclasses.dataclass
+class _PendingItem(Generic[TItem, TResult]):
+    item: TItem
+    n_tokens: int
+    future: asyncio.Future[TResult]
+
+
+@dataclasses.dataclass
+class MicroBatchStats:
+    queue_depth: int
+    batches_processed: int
+    items_processed: int
+    mean_batch_size: float
+    mean_fill_ratio: float
+
+
+class MicroBatchScheduler(Generic[TItem, TResult]):
+    # Collects items submitted by concurrent requests into shared batches and runs them on a dedicated
+    # worker thread, so model forward passes never block the event loop.
+    def __init__(
+        self,
+        config: MicroBatchingConfig,
+        process_batch: Callable[[list[TItem]], list[TResult]],
+        name: str,
+        on_batch: Callable[[int, int], None] | None = None,
+    ) -> None:
+        self._config = config
+        self._process_batch = process_batch
+        self._name = name
+        # receives (batch size, padded tokens) of every processed batch
+        self._on_batch = on_batch
+
+        self._queue: asyncio.Queue[_PendingItem[TItem, TResult]] = asyncio.Queue()
+        self._carry: _PendingItem[TItem, TResult] | None = None
+        # taken off the queue by the worker, being collected or processed by the executor
+        self._batch: list[_PendingItem[TItem, TResult]] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._worker: asyncio.Task | None = None
+
+        self._batches_processed = 0
+        self._items_processed = 0
+        self._fill_ratio_sum = 0.0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(), name=self._name)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        # the worker is gone, so nothing resolves the batch it held, the carried item or the queue anymore
+        pending = self._batch
+        if self._carry is not None:
+            pending.append(self._carry)
+        self._batch = []
+        self._carry = None
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for item in pending:
+            if not item.future.done():
+                item.future.set_exception(RuntimeError(f"Scheduler '{self._name}' is closed"))
+
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> MicroBatchStats:
+        batches = max(self._batches_processed, 1)
+        return MicroBatchStats(
+            queue_depth=self._queue.qsize() + (1 if self._carry is not None else 0),
+            batches_processed=self._batches_processed,
+            items_processed=self._items_processed,
+            mean_batch_size=self._items_processed / batches,
+            mean_fill_ratio=self._fill_ratio_sum / batches,
+        )
+
+    async def submit(self, item: TItem, n_tokens: int) -> TResult:
+        results = await self.submit_many([item], [n_tokens])
+        return results[0]
+
+    async def submit_many(self, items: Sequence[TItem], n_tokens: Sequence[int]) -> list[TResult]:
+        if not items:
+            return []
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item, item_tokens in zip(items, n_tokens, strict=True):
+            future = loop.create_future()
+            self._queue.put_nowait(_PendingItem(item=item, n_tokens=item_tokens, future=future))
+            futures.append(future)
+
+        return list(await asyncio.gather(*futures))
+
+    def _batch_tokens(self, batch: list[_PendingItem[TItem, TResult]]) -> int:
+        # we are going to pad the batch, so count padded tokens
+        return max(x.n_tokens for x in batch) * len(batch)
+
+    def _drain_queue(self, batch: list[_PendingItem[TItem, TResult]]) -> bool:
+        while len(batch) < self._config.max_batch_size:
+            if self._carry is not None:
+                candidate, self._carry = self._carry, None
+            elif not self._queue.empty():
+                candidate = self._queue.get_nowait()
+            else:
+                return False
+
+            # request was cancelled (e.g. client disconnected) while waiting in the queue
+            if candidate.future.done():
+                continue
+
+            if batch and self._batch_tokens([*batch, candidate]) > self._config.max_batch_tokens:
+                self._carry = candidate
+                return True
+
+            batch.append(candidate)
+
+        return True
+
+    async def _collect_batch(self) -> list[_PendingItem[TItem, TResult]]:
+        batch: list[_PendingItem[TItem, TResult]] = []
+        self._batch = batch
+
+        is_full = False
+        while not batch:
+            if self._carry is None and self._queue.empty():
+                self._carry = await self._queue.get()
+            is_full = self._drain_queue(batch)
+
+        if not is_full and self._config.max_wait_ms > 0:
+            await asyncio.sleep(self._config.max_wait_ms / 1000)
+            self._drain_queue(batch)
+
+        return batch
+
+    def _record_batch(self, batch: list[_PendingItem[TItem, TResult]]) -> None:
+        batch_tokens = self._batch_tokens(batch)
+        self._batches_processed += 1
+        self._items_processed += len(batch)
+        self._fill_ratio_sum += min(batch_tokens / self._config.max_batch_tokens, 1.0)
+
+        if self._on_batch is not None:
+            self._on_batch(len(batch), batch_tokens)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [x for x in await self._collect_batch() if not x.future.done()]
+            if not batch:
+                continue
+
+            try:
+                results = await loop.run_in_executor(self._executor, self._process_batch, [x.item for x in batch])
+            # deliver model errors to the waiting requests instead of killing the worker
+            except Exception as e:  # noqa: BLE001
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            self._record_batch(batch)
+
+            for pending, result in zip(batch, results, strict=True):
+                if not pending.future.done():
+                    pending.future.set_result(result)
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class CacheConfig(BaseModel):
+    # zero disables the cache
+    max_size: int = 10000
+    ttl_seconds: float | None = 3600.0
@@ -0,0 +1,69 @@
+import dataclasses
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, TypeVar
+
+from arxiv_at_home.api.component.cache.config import CacheConfig
+
+TKey = TypeVar("TKey", bound=Hashable)
+TValue = TypeVar("TValue")
+
+
+@dataclasses.dataclass
+class CacheStats:
+    size: int
+    hits: int
+    misses: int
+
+
+class LruCache(Generic[TKey, TValue]):
+    def __init__(self, config: CacheConfig) -> None:
+        self._config = config
+        self._entries: OrderedDict[TKey, tuple[TValue, float | None]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: TKey) -> TValue | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key: TKey, value: TValue) -> None:
+        if self._config.max_size <= 0:
+            return
+
+        ttl = self._config.ttl_seconds
+        self._entries[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._config.max_size:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: TKey) -> TValue | None:
+        # does not affect recency or hit counters
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def keys(self) -> list[TKey]:
+        return list(self._entries)
+
+    def invalidate(self, key: TKey) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(size=len(self._entries), hits=self._hits, misses=self._misses)
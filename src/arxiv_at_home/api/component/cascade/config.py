@@ -0,0 +1,26 @@
+from enum import StrEnum
+
+from pydantic import BaseModel
+
+
+class CascadeScorer(StrEnum):
+    # DBSF score of the retrieval stage, free
+    fusion = "fusion"
+    # query embedding x stored metadata/dense vector, Qdrant returns the vectors with the candidates
+    dense = "dense"
+    # small ONNX cross-encoder (fastembed) over title and abstract
+    cross_encoder = "cross_encoder"
+
+
+class CrossEncoderConfig(BaseModel):
+    model: str = "Xenova/ms-marco-MiniLM-L-6-v2"
+    batch_size: int = 64
+    # ONNX Runtime threads, library default when None
+    threads: int | None = None
+
+
+class CascadeConfig(BaseModel):
+    # candidates kept for the LLM reranker per requested result, None sends every candidate to it
+    rerank_more_times: int | None = None
+    scorer: CascadeScorer = CascadeScorer.fusion
+    cross_encoder: CrossEncoderConfig = CrossEncoderConfig()
@@ -0,0 +1,29 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+from arxiv_at_home.api.component.cascade.config import CrossEncoderConfig
+from arxiv_at_home.common.dto import PaperMetadata
+
+
+class CascadeCrossEncoder:
+    def __init__(self, config: CrossEncoderConfig, model: TextCrossEncoder) -> None:
+        self._config = config
+        self._model = model
+        # keeps inference off the event loop, one request at a time
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cascade-cross-encoder")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _score(self, query: str, documents: list[str]) -> list[float]:
+        return list(self._model.rerank(query, documents, batch_size=self._config.batch_size))
+
+    async def score(self, query: str, documents: list[PaperMetadata]) -> list[float]:
+        if not documents:
+            return []
+
+        texts = [f"{paper.title}\n{paper.abstract}" for paper in documents]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._score, query, texts)
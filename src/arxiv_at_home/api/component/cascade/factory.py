@@ -0,0 +1,24 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+
+from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+from arxiv_at_home.api.component.cascade.config import CascadeConfig, CascadeScorer
+from arxiv_at_home.api.component.cascade.cross_encoder import CascadeCrossEncoder
+
+
+@contextmanager
+def create_cascade_cross_encoder(config: CascadeConfig) -> Generator[CascadeCrossEncoder | None, None, None]:
+    # the model is only downloaded and loaded when the cascade uses it
+    if config.rerank_more_times is None or config.scorer != CascadeScorer.cross_encoder:
+        yield None
+        return
+
+    encoder = CascadeCrossEncoder(
+        config.cross_encoder,
+        model=TextCrossEncoder(model_name=config.cross_encoder.model, threads=config.cross_encoder.threads),
+    )
+    try:
+        yield encoder
+    finally:
+        encoder.close()
@@ -0,0 +1,135 @@
+from collections.abc import Iterable
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, disable_created_metrics, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from arxiv_at_home.api.component.batching.scheduler import MicroBatchStats
+from arxiv_at_home.api.component.cache.lru import CacheStats
+from arxiv_at_home.api.dto import SearchStats
+from arxiv_at_home.common.database.manager import DatabasePoolStatus
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+_COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+_TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+
+class _CacheStatsCollector(Collector):
+    # hit and miss totals are tracked by the caches themselves, so they are exposed as snapshots on every scrape
+    def __init__(self) -> None:
+        self._stats: dict[str, CacheStats] = {}
+
+    def update(self, cache: str, stats: CacheStats) -> None:
+        self._stats[cache] = stats
+
+    def collect(self) -> Iterable[Metric]:
+        size = GaugeMetricFamily("arxiv_cache_size", "Number of cache entries", labels=["cache"])
+        hits = CounterMetricFamily("arxiv_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("arxiv_cache_misses", "Cache misses", labels=["cache"])
+        for cache, stats in self._stats.items():
+            size.add_metric([cache], stats.size)
+            hits.add_metric([cache], stats.hits)
+            misses.add_metric([cache], stats.misses)
+        return [size, hits, misses]
+
+
+class ApiMetrics:
+    def __init__(self) -> None:
+        # process-wide; *_created series would double the number of histogram samples
+        disable_created_metrics()
+        # not the global registry, so that every application instance has its own metrics
+        self._registry = CollectorRegistry()
+
+        self._search_seconds = Histogram(
+            "arxiv_search_seconds", "Total search latency", buckets=_LATENCY_BUCKETS, registry=self._registry
+        )
+        self._search_stage_seconds = Histogram(
+            "arxiv_search_stage_seconds",
+            "Latency of a search stage",
+            labelnames=["stage"],
+            buckets=_LATENCY_BUCKETS,
+            registry=self._registry,
+        )
+        self._search_candidates = Histogram(
+            "arxiv_search_candidates",
+            "Number of candidates in a search stage",
+            labelnames=["stage"],
+            buckets=_COUNT_BUCKETS,
+            registry=self._registry,
+        )
+        self._search_tokens = Histogram(
+            "arxiv_search_tokens",
+            "Number of tokens processed by a model per search",
+            labelnames=["model"],
+            buckets=_TOKEN_BUCKETS,
+            registry=self._registry,
+        )
+
+        self._model_batch_size = Histogram(
+            "arxiv_model_batch_size",
+            "Number of sequences in a model batch",
+            labelnames=["model"],
+            buckets=_COUNT_BUCKETS,
+            registry=self._registry,
+        )
+        self._model_batch_tokens = Histogram(
+            "arxiv_model_batch_tokens",
+            "Number of padded tokens in a model batch",
+            labelnames=["model"],
+            buckets=_TOKEN_BUCKETS,
+            registry=self._registry,
+        )
+        self._model_queue_depth = Gauge(
+            "arxiv_model_queue_depth",
+            "Number of sequences waiting for a model batch",
+            labelnames=["model"],
+            registry=self._registry,
+        )
+
+        self._cache_stats = _CacheStatsCollector()
+        self._registry.register(self._cache_stats)
+
+        self._citation_refresh_failures = Counter(
+            "arxiv_citation_refresh_failures",
+            "Background citation count refreshes that failed",
+            registry=self._registry,
+        )
+
+        self._db_pool_size = Gauge("arxiv_db_pool_size", "Database connection pool size", registry=self._registry)
+        self._db_pool_checked_out = Gauge(
+            "arxiv_db_pool_checked_out", "Database connections currently in use", registry=self._registry
+        )
+        self._db_pool_overflow = Gauge(
+            "arxiv_db_pool_overflow", "Database connections opened above the pool size", registry=self._registry
+        )
+
+    def observe_search(self, stats: SearchStats) -> None:
+        self._search_seconds.observe(stats.time_taken_seconds)
+        for stage, seconds in stats.stage_seconds.items():
+            self._search_stage_seconds.labels(stage=stage).observe(seconds)
+
+        self._search_candidates.labels(stage="retrieve").observe(stats.num_candidates)
+        self._search_candidates.labels(stage="rerank").observe(stats.num_reranked)
+        self._search_tokens.labels(model="query_encoder").observe(stats.query_tokens)
+        self._search_tokens.labels(model="reranker").observe(stats.rerank_tokens)
+
+    def observe_model_batch(self, model: str, batch_size: int, batch_tokens: int) -> None:
+        self._model_batch_size.labels(model=model).observe(batch_size)
+        self._model_batch_tokens.labels(model=model).observe(batch_tokens)
+
+    def observe_citation_refresh_failure(self) -> None:
+        self._citation_refresh_failures.inc()
+
+    def update_scheduler(self, model: str, stats: MicroBatchStats) -> None:
+        self._model_queue_depth.labels(model=model).set(stats.queue_depth)
+
+    def update_cache(self, cache: str, stats: CacheStats) -> None:
+        self._cache_stats.update(cache, stats)
+
+    def update_db_pool(self, status: DatabasePoolStatus) -> None:
+        self._db_pool_size.set(status.size)
+        self._db_pool_checked_out.set(status.checked_out)
+        self._db_pool_overflow.set(status.overflow)
+
+    def render(self) -> str:
+        return generate_latest(self._registry).decode()
@@ -0,0 +1,43 @@
+import datetime as dt
+
+from arxiv_at_home.api.component.cache.lru import CacheStats, LruCache
+from arxiv_at_home.api.component.paper_cache.config import PaperCacheConfig
+from arxiv_at_home.common.database.repository import PaperMetadataRepository
+from arxiv_at_home.common.dto import PaperMetadata
+
+
+class PaperMetadataCache:
+    # Validated paper metadata shared between requests. Entries remember the synced_at they were read with and are
+    # served only after the database confirms that the row was not re-synced or removed since.
+    def __init__(self, config: PaperCacheConfig) -> None:
+        self._config = config
+        self._papers: LruCache[str, tuple[PaperMetadata, dt.datetime]] = LruCache(config.cache)
+
+    def stats(self) -> CacheStats:
+        return self._papers.stats()
+
+    async def lookup(
+        self, fully_qualified_names: list[str], repository: PaperMetadataRepository
+    ) -> dict[str, PaperMetadata]:
+        cached = {}
+        for fqn in dict.fromkeys(fully_qualified_names):
+            entry = self._papers.get(fqn)
+            if entry is not None:
+                cached[fqn] = entry
+        if not cached:
+            return {}
+
+        # a narrow primary key lookup instead of fetching and validating the full rows
+        sync_times = await repository.get_sync_times(list(cached))
+
+        found = {}
+        for fqn, (paper, synced_at) in cached.items():
+            if sync_times.get(fqn) == synced_at:
+                found[fqn] = paper
+            else:
+                self._papers.invalidate(fqn)
+        return found
+
+    def store(self, papers: list[tuple[PaperMetadata, dt.datetime]]) -> None:
+        for paper, synced_at in papers:
+            self._papers.put(paper.fully_qualified_name, (paper, synced_at))
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+from arxiv_at_home.api.component.cache.config import CacheConfig
+
+
+class PaperCacheConfig(BaseModel):
+    # freshness is checked against paper_records.synced_at on every lookup, so entries do not need a TTL
+    cache: CacheConfig = CacheConfig(max_size=50000, ttl_seconds=None)
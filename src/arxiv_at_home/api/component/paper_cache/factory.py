@@ -0,0 +1,6 @@
+from arxiv_at_home.api.component.paper_cache.cache import PaperMetadataCache
+from arxiv_at_home.api.component.paper_cache.config import PaperCacheConfig
+
+
+def create_paper_metadata_cache(config: PaperCacheConfig) -> PaperMetadataCache:
+    return PaperMetadataCache(config)
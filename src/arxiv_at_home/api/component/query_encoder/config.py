@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+from arxiv_at_home.api.component.batching.config import MicroBatchingConfig
+from arxiv_at_home.api.component.cache.config import CacheConfig
+
+
+class QueryEncoderConfig(BaseModel):
+    batching: MicroBatchingConfig = MicroBatchingConfig()
+    cache: CacheConfig = CacheConfig()
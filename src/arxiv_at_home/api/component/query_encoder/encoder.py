@@ -0,0 +1,93 @@
+import dataclasses
+from collections.abc import Callable
+
+from tokenizers import Tokenizer
+
+from arxiv_at_home.api.component.batching.scheduler import MicroBatchScheduler, MicroBatchStats
+from arxiv_at_home.api.component.cache.lru import CacheStats, LruCache
+from arxiv_at_home.api.component.query_encoder.config import QueryEncoderConfig
+from arxiv_at_home.common.dense.config import DenseVectorizationConfig
+from arxiv_at_home.common.dense.template import DenseEncodingTemplate
+from arxiv_at_home.common.dense.vectorizer import DenseVectorizer
+from arxiv_at_home.common.inference.collate import collate_right_padded
+
+
+@dataclasses.dataclass
+class EncodedQuery:
+    embedding: list[float]
+    # zero when the embedding was served from cache
+    n_tokens: int
+
+
+class QueryEncoder:
+    def __init__(
+        self,
+        config: QueryEncoderConfig,
+        dense_config: DenseVectorizationConfig,
+        vectorizer: DenseVectorizer,
+        tokenizer: Tokenizer,
+        template: DenseEncodingTemplate,
+        on_batch: Callable[[int, int], None] | None = None,
+    ) -> None:
+        self._dense_config = dense_config
+        self._vectorizer = vectorizer
+        self._tokenizer = tokenizer
+        self._template = template
+        self._scheduler: MicroBatchScheduler[list[int], list[float]] = MicroBatchScheduler(
+            config.batching, self._encode_batch, name="query-encoder", on_batch=on_batch
+        )
+        self._cache: LruCache[tuple[str, int | None, str], list[float]] = LruCache(config.cache)
+
+    def start(self) -> None:
+        self._scheduler.start()
+
+    async def close(self) -> None:
+        await self._scheduler.close()
+
+    def stats(self) -> MicroBatchStats:
+        return self._scheduler.stats()
+
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def _encode_batch(self, token_ids: list[list[int]]) -> list[list[float]]:
+        embeddings = self._vectorizer(collate_right_padded(token_ids))
+        return [x.tolist() for x in embeddings]
+
+    async def encode(self, query: str) -> EncodedQuery:
+        encoded = await self.encode_many([query])
+        return encoded[0]
+
+    async def encode_many(self, queries: list[str]) -> list[EncodedQuery]:
+        templated = [self._template.template_query(query) for query in queries]
+
+        # templated text already includes the query template, so entries from another template never match
+        cache_keys = [(self._dense_config.model, self._dense_config.output_dim, text) for text in templated]
+        embeddings = [self._cache.get(key) for key in cache_keys]
+        n_tokens = [0] * len(queries)
+
+        # identical queries within one call are encoded once
+        miss_keys = list(
+            dict.fromkeys(key for key, embedding in zip(cache_keys, embeddings, strict=True) if embedding is None)
+        )
+        if miss_keys:
+            encodings = self._tokenizer.encode_batch([text for _, _, text in miss_keys])
+            miss_embeddings = await self._scheduler.submit_many(
+                [x.ids for x in encodings], n_tokens=[len(x.ids) for x in encodings]
+            )
+
+            miss_map = {}
+            for key, encoding, embedding in zip(miss_keys, encodings, miss_embeddings, strict=True):
+                self._cache.put(key, embedding)
+                miss_map[key] = (embedding, len(encoding.ids))
+
+            for i, key in enumerate(cache_keys):
+                if embeddings[i] is None:
+                    embeddings[i], n_tokens[i] = miss_map[key]
+                    # tokens of a duplicate query are only counted once
+                    miss_map[key] = (embeddings[i], 0)
+
+        return [
+            EncodedQuery(embedding=embedding, n_tokens=tokens)
+            for embedding, tokens in zip(embeddings, n_tokens, strict=True)
+        ]
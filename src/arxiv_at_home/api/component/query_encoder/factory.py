@@ -0,0 +1,34 @@
+from collections.abc import AsyncGenerator, Callable
+from contextlib import asynccontextmanager
+
+from tokenizers import Tokenizer
+
+from arxiv_at_home.api.component.query_encoder.config import QueryEncoderConfig
+from arxiv_at_home.api.component.query_encoder.encoder import QueryEncoder
+from arxiv_at_home.common.dense.config import DenseVectorizationConfig
+from arxiv_at_home.common.dense.template import DenseEncodingTemplate
+from arxiv_at_home.common.dense.vectorizer import DenseVectorizer
+
+
+@asynccontextmanager
+async def create_query_encoder(
+    config: QueryEncoderConfig,
+    dense_config: DenseVectorizationConfig,
+    vectorizer: DenseVectorizer,
+    tokenizer: Tokenizer,
+    template: DenseEncodingTemplate,
+    on_batch: Callable[[int, int], None] | None = None,
+) -> AsyncGenerator[QueryEncoder, None]:
+    encoder = QueryEncoder(
+        config,
+        dense_config=dense_config,
+        vectorizer=vectorizer,
+        tokenizer=tokenizer,
+        template=template,
+        on_batch=on_batch,
+    )
+    encoder.start()
+    try:
+        yield encoder
+    finally:
+        await encoder.close()
@@ -0,0 +1,54 @@
+import hashlib
+import json
+
+from arxiv_at_home.api.component.cache.lru import CacheStats, LruCache
+from arxiv_at_home.api.component.reranker.config import RerankerConfig
+from arxiv_at_home.common.dto import PaperMetadata
+
+
+def normalize_rerank_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _hash_paper_content(paper: PaperMetadata) -> str:
+    # only fields that are visible to the reranker
+    return _hash_text(json.dumps([paper.title, sorted(paper.categories), paper.abstract]))
+
+
+class RerankScoreCache:
+    def __init__(self, config: RerankerConfig) -> None:
+        self._namespace = _hash_text(json.dumps([config.model, config.template, config.token_true, config.token_false]))
+        # value is (paper content hash, score) so that entries for updated papers are dropped on lookup
+        self._scores: LruCache[tuple[str, str, str], tuple[str, float]] = LruCache(config.score_cache)
+
+    def _key(self, query: str, paper: PaperMetadata) -> tuple[str, str, str]:
+        return self._namespace, query, paper.fully_qualified_name
+
+    def lookup(self, query: str, documents: list[PaperMetadata]) -> list[float | None]:
+        scores: list[float | None] = []
+        for paper in documents:
+            key = self._key(query, paper)
+            entry = self._scores.get(key)
+            if entry is None:
+                scores.append(None)
+                continue
+
+            content_hash, score = entry
+            if content_hash != _hash_paper_content(paper):
+                self._scores.invalidate(key)
+                scores.append(None)
+                continue
+
+            scores.append(score)
+        return scores
+
+    def store(self, query: str, documents: list[PaperMetadata], scores: list[float]) -> None:
+        for paper, score in zip(documents, scores, strict=True):
+            self._scores.put(self._key(query, paper), (_hash_paper_content(paper), score))
+
+    def stats(self) -> CacheStats:
+        return self._scores.stats()
@@ -1,5 +1,9 @@
 from pydantic import BaseModel
 
+from arxiv_at_home.api.component.batching.config import MicroBatchingConfig
+from arxiv_at_home.api.component.cache.config import CacheConfig
+from arxiv_at_home.common.inference.config import InferenceBackendConfig
+
 
 class RerankerConfig(BaseModel):
     device: str
@@ -8,3 +12,18 @@ class RerankerConfig(BaseModel):
 
     token_true: str
     token_false: str
+
+    # runs in bfloat16 unless backend.dtype says otherwise
+    backend: InferenceBackendConfig = InferenceBackendConfig()
+
+    # reuse key/value cache of the shared template prefix instead of re-encoding it for every candidate
+    prefix_cache: bool = True
+    # compares cached and full sequence scores on a few probes at startup (two extra forward passes)
+    verify_prefix_cache: bool = False
+    prefix_cache_tolerance: float = 1e-2
+
+    # candidates are split into length-sorted sub-batches of at most this many padded tokens
+    max_sub_batch_tokens: int = 16384
+
+    batching: MicroBatchingConfig = MicroBatchingConfig()
+    score_cache: CacheConfig = CacheConfig(max_size=100000)
@@ -1,13 +1,22 @@
-from collections.abc import Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Callable, Generator
+from contextlib import asynccontextmanager, contextmanager
 
 import torch
 from tokenizers import Tokenizer
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
+from arxiv_at_home.api.component.reranker.cache import RerankScoreCache
 from arxiv_at_home.api.component.reranker.config import RerankerConfig
 from arxiv_at_home.api.component.reranker.model import GenerativeReranker, RerankInputProcessor
+from arxiv_at_home.api.component.reranker.scheduler import RerankScheduler
 from arxiv_at_home.api.component.reranker.template import RerankTemplate
+from arxiv_at_home.common.inference.backend import (
+    apply_inference_backend,
+    check_parity,
+    configure_threads,
+    resolve_dtype,
+)
+from arxiv_at_home.common.inference.config import InferenceBackendType
 
 
 def _create_tokenizer(config: RerankerConfig) -> Tokenizer:
@@ -15,19 +24,70 @@ def _create_tokenizer(config: RerankerConfig) -> Tokenizer:
 
 
 @contextmanager
-def create_reranker(config: RerankerConfig) -> Generator[GenerativeReranker, None, None]:
+def create_reranker(
+    config: RerankerConfig, processor: RerankInputProcessor
+) -> Generator[GenerativeReranker, None, None]:
+    backend = config.backend
+    if backend.type == InferenceBackendType.onnx and config.prefix_cache:
+        raise ValueError("The onnx backend does not support 'prefix_cache'")
+
+    configure_threads(backend)
     model = (
-        AutoModelForCausalLM.from_pretrained(config.model, dtype=torch.bfloat16, attn_implementation="sdpa")
+        AutoModelForCausalLM.from_pretrained(
+            config.model, dtype=resolve_dtype(backend, default=torch.bfloat16), attn_implementation="sdpa"
+        )
         .eval()
         .to(config.device)
     )
+    tokenizer = _create_tokenizer(config)
+
+    reranker = GenerativeReranker(
+        config,
+        model,
+        tokenizer,
+        prefix_ids=processor.prefix_ids,
+        backbone=apply_inference_backend(backend, model.get_decoder(), config.device),
+    )
+    if backend.type != InferenceBackendType.eager and backend.parity_tolerance is not None:
+        reference = GenerativeReranker(
+            config.model_copy(update={"prefix_cache": False}), model, tokenizer, prefix_ids=processor.prefix_ids
+        )
+        max_diff = max(
+            abs(a - b) for a, b in zip(reranker.score_probes(tokenizer), reference.score_probes(tokenizer), strict=True)
+        )
+        check_parity(backend, "Reranker", max_diff)
+        del reference
 
-    yield GenerativeReranker(config, model, _create_tokenizer(config))
+    # the eager model stays alive only if the backend wraps it
+    del model
+
+    yield reranker
 
 
 def create_rerank_processor(config: RerankerConfig) -> RerankInputProcessor:
-    return RerankInputProcessor(_create_tokenizer(config), config.device)
+    return RerankInputProcessor(
+        _create_tokenizer(config), config.device, template_prefix=create_rerank_template(config).prefix
+    )
 
 
 def create_rerank_template(config: RerankerConfig) -> RerankTemplate:
     return RerankTemplate(config)
+
+
+def create_rerank_score_cache(config: RerankerConfig) -> RerankScoreCache:
+    return RerankScoreCache(config)
+
+
+@asynccontextmanager
+async def create_rerank_scheduler(
+    config: RerankerConfig,
+    reranker: GenerativeReranker,
+    processor: RerankInputProcessor,
+    on_batch: Callable[[int, int], None] | None = None,
+) -> AsyncGenerator[RerankScheduler, None]:
+    scheduler = RerankScheduler(config, reranker=reranker, processor=processor, on_batch=on_batch)
+    scheduler.start()
+    try:
+        yield scheduler
+    finally:
+        await scheduler.close()
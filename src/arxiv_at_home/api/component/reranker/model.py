@@ -2,74 +2,196 @@ from typing import TypedDict
 
 import torch
 import torch.nn.functional as F  # noqa: N812
-from d9d.dataset import PaddingSide1D, pad_stack_1d
 from tokenizers import Tokenizer
-from transformers import AutoModelForCausalLM
+from torch import nn
+from transformers import DynamicCache, PreTrainedModel
 
 from arxiv_at_home.api.component.reranker.config import RerankerConfig
+from arxiv_at_home.common.inference.collate import collate_right_padded
+
+_PREFIX_CACHE_PROBES = [
+    "attention is all you need\n<Document>: Attention Is All You Need",
+    "graph neural networks for molecules\n<Document>: A survey on large language models for code generation",
+]
 
 
 class RerankInputs(TypedDict):
+    # right-padded token ids that follow the shared template prefix
     input_ids: torch.Tensor
     attention_mask: torch.Tensor
 
 
 class RerankInputProcessor:
-    def __init__(self, tokenizer: Tokenizer, device: str) -> None:
+    def __init__(self, tokenizer: Tokenizer, device: str, template_prefix: str) -> None:
         self._tokenizer = tokenizer
         self._device = device
 
-    def _encode_template(self, template: str) -> RerankInputs:
-        input_tokens = self._tokenizer.encode(template)
-        return {
-            "input_ids": torch.tensor(
-                input_tokens.ids,
-                dtype=torch.long,
-                device=self._device,
-            ),
-            "attention_mask": torch.tensor(
-                input_tokens.attention_mask,
-                dtype=torch.long,
-                device=self._device,
-            ),
-        }
+        # the last prefix token may be merged with the query text, so it is tokenized together with the suffix
+        prefix_encoding = tokenizer.encode(template_prefix)
+        n_prefix_tokens = max(len(prefix_encoding.ids) - 1, 0)
+        self._prefix_ids = prefix_encoding.ids[:n_prefix_tokens]
+        self._prefix_chars = prefix_encoding.offsets[n_prefix_tokens - 1][1] if n_prefix_tokens > 0 else 0
+        self._template_prefix = template_prefix
+
+    @property
+    def prefix_ids(self) -> list[int]:
+        return self._prefix_ids
+
+    def _strip_prefix(self, template: str) -> str:
+        if not template.startswith(self._template_prefix):
+            raise ValueError("Rerank input does not start with the template prefix")
+        return template[self._prefix_chars :]
+
+    def tokenize(self, template: str) -> list[int]:
+        if not self._prefix_ids:
+            return self._tokenizer.encode(template).ids
+        return self._tokenizer.encode(self._strip_prefix(template), add_special_tokens=False).ids
+
+    def encode_batch(self, templates: list[str]) -> list[list[int]]:
+        if not self._prefix_ids:
+            return [x.ids for x in self._tokenizer.encode_batch(templates)]
+        suffixes = [self._strip_prefix(x) for x in templates]
+        return [x.ids for x in self._tokenizer.encode_batch(suffixes, add_special_tokens=False)]
+
+    def split_by_token_budget(self, lengths: list[int], max_tokens: int) -> list[list[int]]:
+        # group sequences of similar length together so that padding is minimal,
+        # each group stays within max_tokens padded tokens
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+        groups: list[list[int]] = []
+        current: list[int] = []
+        for idx in order:
+            # sorted ascending, so the current sequence is the longest one in the group
+            if current and lengths[idx] * (len(current) + 1) > max_tokens:
+                groups.append(current)
+                current = []
+            current.append(idx)
+
+        if current:
+            groups.append(current)
+
+        return groups
+
+    def collate(self, token_ids: list[list[int]]) -> RerankInputs:
+        return collate_right_padded(token_ids, self._device)
 
     def encode(self, templates: list[str]) -> RerankInputs:
-        encodings = [self._encode_template(x) for x in templates]
-        return {
-            "input_ids": pad_stack_1d(
-                [x["input_ids"] for x in encodings], pad_value=0, padding_side=PaddingSide1D.left
-            ),
-            "attention_mask": pad_stack_1d(
-                [x["attention_mask"] for x in encodings], pad_value=0, padding_side=PaddingSide1D.left
-            ),
-        }
+        return self.collate(self.encode_batch(templates))
 
 
 class GenerativeReranker:
-    def __init__(self, config: RerankerConfig, model: AutoModelForCausalLM, tokenizer: Tokenizer) -> None:
+    def __init__(
+        self,
+        config: RerankerConfig,
+        model: PreTrainedModel,
+        tokenizer: Tokenizer,
+        prefix_ids: list[int],
+        backbone: nn.Module | None = None,
+    ) -> None:
         self._config = config
         self._device = torch.device(config.device)
-        self._model = model
+        # the model itself is not kept, so an inference backend may replace its decoder entirely
+        self._model_config = model.config
+        self._backbone = backbone if backbone is not None else model.get_decoder()
 
         # Cache token IDs for scoring
         self._token_true_id = tokenizer.token_to_id(config.token_true)
         self._token_false_id = tokenizer.token_to_id(config.token_false)
 
+        # Only [False, True] rows of LM head are needed, so we never materialize logits over the whole vocabulary
+        lm_head = model.get_output_embeddings()
+        answer_ids = torch.tensor([self._token_false_id, self._token_true_id], device=lm_head.weight.device)
+        self._answer_weight = lm_head.weight.detach().index_select(0, answer_ids)
+        self._answer_bias = lm_head.bias.detach().index_select(0, answer_ids) if lm_head.bias is not None else None
+
+        self._prefix_ids = torch.tensor(prefix_ids, dtype=torch.long, device=self._device)
+        self._prefix_cache: list[tuple[torch.Tensor, torch.Tensor]] | None = None
+        if config.prefix_cache and prefix_ids:
+            self._prefix_cache = self._compute_prefix_cache()
+            if config.verify_prefix_cache:
+                self._verify_prefix_cache(tokenizer)
+
+    @property
+    def uses_prefix_cache(self) -> bool:
+        return self._prefix_cache is not None
+
+    def token_cost(self, n_suffix_tokens: int) -> int:
+        if self._prefix_cache is not None:
+            return n_suffix_tokens
+        return n_suffix_tokens + self._prefix_ids.shape[0]
+
     @torch.inference_mode()
-    def __call__(self, batch: RerankInputs) -> list[float]:
+    def _compute_prefix_cache(self) -> list[tuple[torch.Tensor, torch.Tensor]]:
+        cache = self._backbone(input_ids=self._prefix_ids[None, :], use_cache=True).past_key_values
+        return [(layer.keys, layer.values) for layer in cache.layers]
+
+    def _probe_inputs(self, tokenizer: Tokenizer) -> RerankInputs:
+        return collate_right_padded(
+            [tokenizer.encode(x, add_special_tokens=False).ids for x in _PREFIX_CACHE_PROBES], self._device
+        )
+
+    def score_probes(self, tokenizer: Tokenizer) -> list[float]:
+        return self(self._probe_inputs(tokenizer))
+
+    def _verify_prefix_cache(self, tokenizer: Tokenizer) -> None:
+        probe = self._probe_inputs(tokenizer)
+
+        cached_scores = self._score(probe, use_prefix_cache=True)
+        full_scores = self._score(probe, use_prefix_cache=False)
+        max_diff = max(abs(a - b) for a, b in zip(cached_scores, full_scores, strict=True))
+        if max_diff > self._config.prefix_cache_tolerance:
+            raise ValueError(
+                f"Prefix cache scores differ from full sequence scores by {max_diff:.4f}, "
+                f"consider disabling 'prefix_cache'"
+            )
+
+    def _expand_prefix_cache(self, batch_size: int) -> DynamicCache:
+        if self._prefix_cache is None:
+            raise ValueError(
+                "The prefix cache is not computed, it needs 'prefix_cache' and a non-empty template prefix"
+            )
+
+        # expanded views are not copied - the cache concatenates new keys/values into fresh tensors
+        return DynamicCache(
+            ddp_cache_data=[
+                (keys.expand(batch_size, -1, -1, -1), values.expand(batch_size, -1, -1, -1))
+                for keys, values in self._prefix_cache
+            ],
+            config=self._model_config,
+        )
+
+    def _last_hidden_states(self, batch: RerankInputs, use_prefix_cache: bool) -> torch.Tensor:
         input_ids = batch["input_ids"]
         attention_mask = batch["attention_mask"]
 
-        logits = self._model(input_ids=input_ids, attention_mask=attention_mask).logits
-
-        batch_scores = logits[:, -1, :]
+        batch_size = input_ids.shape[0]
+        prefix_len = self._prefix_ids.shape[0]
+        prefix_mask = torch.ones((batch_size, prefix_len), dtype=attention_mask.dtype, device=attention_mask.device)
+        full_attention_mask = torch.cat([prefix_mask, attention_mask], dim=1)
+
+        if use_prefix_cache:
+            hidden_states = self._backbone(
+                input_ids=input_ids,
+                attention_mask=full_attention_mask,
+                past_key_values=self._expand_prefix_cache(batch_size),
+            ).last_hidden_state
+            last_positions = attention_mask.sum(dim=1) - 1
+        else:
+            full_input_ids = torch.cat([self._prefix_ids.expand(batch_size, -1), input_ids], dim=1)
+            hidden_states = self._backbone(
+                input_ids=full_input_ids, attention_mask=full_attention_mask, use_cache=False
+            ).last_hidden_state
+            last_positions = prefix_len + attention_mask.sum(dim=1) - 1
+
+        # inputs are right-padded, so pick the last non-padding position of each row
+        return hidden_states[torch.arange(batch_size, device=hidden_states.device), last_positions]
 
-        true_vector = batch_scores[:, self._token_true_id]
-        false_vector = batch_scores[:, self._token_false_id]
+    @torch.inference_mode()
+    def _score(self, batch: RerankInputs, use_prefix_cache: bool) -> list[float]:
+        last_hidden_states = self._last_hidden_states(batch, use_prefix_cache=use_prefix_cache)
 
-        # Stack as [False, True]
-        relevant_logits = torch.stack([false_vector, true_vector], dim=1)
+        # Logits as [False, True]
+        relevant_logits = F.linear(last_hidden_states, self._answer_weight, self._answer_bias)
 
         # Normalize via LogSoftmax
         log_probs = F.log_softmax(relevant_logits, dim=1)
@@ -78,3 +200,6 @@ class GenerativeReranker:
         scores = log_probs[:, 1].exp().tolist()
 
         return scores
+
+    def __call__(self, batch: RerankInputs) -> list[float]:
+        return self._score(batch, use_prefix_cache=self._prefix_cache is not None)
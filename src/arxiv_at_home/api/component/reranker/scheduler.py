@@ -0,0 +1,58 @@
+import asyncio
+import dataclasses
+from collections.abc import Callable
+
+from arxiv_at_home.api.component.batching.scheduler import MicroBatchScheduler, MicroBatchStats
+from arxiv_at_home.api.component.reranker.config import RerankerConfig
+from arxiv_at_home.api.component.reranker.model import GenerativeReranker, RerankInputProcessor
+
+
+@dataclasses.dataclass
+class RerankScores:
+    scores: list[float]
+    n_tokens: int
+
+
+class RerankScheduler:
+    def __init__(
+        self,
+        config: RerankerConfig,
+        reranker: GenerativeReranker,
+        processor: RerankInputProcessor,
+        on_batch: Callable[[int, int], None] | None = None,
+    ) -> None:
+        self._config = config
+        self._reranker = reranker
+        self._processor = processor
+        self._scheduler: MicroBatchScheduler[list[int], float] = MicroBatchScheduler(
+            config.batching, self._score_batch, name="reranker", on_batch=on_batch
+        )
+
+    def start(self) -> None:
+        self._scheduler.start()
+
+    async def close(self) -> None:
+        await self._scheduler.close()
+
+    def stats(self) -> MicroBatchStats:
+        return self._scheduler.stats()
+
+    def _score_batch(self, token_ids: list[list[int]]) -> list[float]:
+        lengths = [self._reranker.token_cost(len(x)) for x in token_ids]
+        scores = [0.0] * len(token_ids)
+
+        for group in self._processor.split_by_token_budget(lengths, max_tokens=self._config.max_sub_batch_tokens):
+            group_scores = self._reranker(self._processor.collate([token_ids[i] for i in group]))
+            for i, score in zip(group, group_scores, strict=True):
+                scores[i] = score
+
+        return scores
+
+    async def score(self, templates: list[str]) -> RerankScores:
+        if not templates:
+            return RerankScores(scores=[], n_tokens=0)
+
+        token_ids = await asyncio.to_thread(self._processor.encode_batch, templates)
+        token_costs = [self._reranker.token_cost(len(x)) for x in token_ids]
+        scores = await self._scheduler.submit_many(token_ids, token_costs)
+        return RerankScores(scores=scores, n_tokens=sum(token_costs))
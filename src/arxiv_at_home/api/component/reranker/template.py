@@ -13,6 +13,11 @@ class RerankTemplate:
         if _DOC_REPLACE not in config.template:
             raise ValueError(f"Invalid template - it should contain '{_DOC_REPLACE}'")
 
+    @property
+    def prefix(self) -> str:
+        # part of the template that is shared by every (query, document) pair
+        return self._template[: min(self._template.index(_QUERY_REPLACE), self._template.index(_DOC_REPLACE))]
+
     def format(self, query: str, metadata: PaperMetadata) -> str:
         doc = f"""
 {metadata.title}
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+from arxiv_at_home.api.component.cache.config import CacheConfig
+
+
+class SearchCursorConfig(BaseModel):
+    # one entry per paginated search, holding names and scores of its ranked candidates
+    # (and their metadata with search.hydration=payload); zero max_size disables pagination
+    cache: CacheConfig = CacheConfig(max_size=1000, ttl_seconds=600.0)
+    # pages are not served beyond this many results
+    max_results: int = 1000
@@ -0,0 +1,6 @@
+from arxiv_at_home.api.component.search_cursor.config import SearchCursorConfig
+from arxiv_at_home.api.component.search_cursor.store import SearchCursorStore
+
+
+def create_search_cursor_store(config: SearchCursorConfig) -> SearchCursorStore:
+    return SearchCursorStore(config)
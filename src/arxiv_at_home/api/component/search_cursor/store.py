@@ -0,0 +1,98 @@
+import asyncio
+import base64
+import binascii
+import dataclasses
+import secrets
+
+from arxiv_at_home.api.component.cache.lru import CacheStats, LruCache
+from arxiv_at_home.api.component.search_cursor.config import SearchCursorConfig
+from arxiv_at_home.api.dto import SearchRequest
+from arxiv_at_home.common.dto import PaperMetadata
+
+
+class InvalidSearchCursorError(ValueError):
+    pass
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RankedCandidate:
+    fully_qualified_name: str
+    score: float
+    citations: int | None
+    # only kept with search.hydration=payload, otherwise the page that serves the paper hydrates it again
+    paper: PaperMetadata | None = None
+
+
+@dataclasses.dataclass
+class SearchCursorEntry:
+    # the request of the first page, pages must repeat its query and filters
+    request: SearchRequest
+    # reranked and boosted candidates in final order, later pages only append to it
+    results: list[RankedCandidate]
+    # Qdrant limit (before prefetch_more_times) of the last retrieval
+    retrieve_limit: int
+    # Qdrant has no candidates beyond the retrieved ones
+    exhausted: bool
+    # serializes extensions of the same entry by concurrent page requests
+    lock: asyncio.Lock = dataclasses.field(default_factory=asyncio.Lock)
+
+    @property
+    def seen(self) -> set[str]:
+        return {x.fully_qualified_name for x in self.results}
+
+
+def _search_key(request: SearchRequest) -> tuple:
+    return (
+        request.collection,
+        request.query,
+        frozenset(request.categories or ()),
+        request.updated_after,
+        request.updated_before,
+    )
+
+
+class SearchCursorStore:
+    def __init__(self, config: SearchCursorConfig) -> None:
+        self._config = config
+        self._entries: LruCache[str, SearchCursorEntry] = LruCache(config.cache)
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.cache.max_size > 0
+
+    @property
+    def max_results(self) -> int:
+        return self._config.max_results
+
+    def create(self, entry: SearchCursorEntry) -> str:
+        entry_id = secrets.token_urlsafe(16)
+        self._entries.put(entry_id, entry)
+        return entry_id
+
+    def encode(self, entry_id: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{entry_id}:{offset}".encode()).decode()
+
+    def resolve(self, request: SearchRequest) -> tuple[str, SearchCursorEntry, int]:
+        if request.limit < 1:
+            raise InvalidSearchCursorError("Page size (limit) should be positive")
+
+        try:
+            entry_id, offset = base64.urlsafe_b64decode(request.cursor.encode()).decode().rsplit(":", 1)
+            offset = int(offset)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise InvalidSearchCursorError("Malformed search cursor") from e
+        if offset < 0:
+            raise InvalidSearchCursorError("Malformed search cursor")
+
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            raise InvalidSearchCursorError("Search cursor is unknown or expired")
+        if _search_key(entry.request) != _search_key(request):
+            raise InvalidSearchCursorError("Search cursor belongs to a different query")
+        # issued cursors never point past the stored results
+        if offset > len(entry.results):
+            raise InvalidSearchCursorError("Malformed search cursor")
+        return entry_id, entry, offset
+
+    def stats(self) -> CacheStats:
+        return self._entries.stats()
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+from arxiv_at_home.api.component.cache.config import CacheConfig
+
+
+class SparseQueryEncoderConfig(BaseModel):
+    cache: CacheConfig = CacheConfig()
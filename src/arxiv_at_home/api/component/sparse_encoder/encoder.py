@@ -0,0 +1,39 @@
+import asyncio
+
+from fastembed import SparseTextEmbedding
+from qdrant_client import models
+
+from arxiv_at_home.api.component.cache.lru import CacheStats, LruCache
+from arxiv_at_home.api.component.sparse_encoder.config import SparseQueryEncoderConfig
+
+
+class SparseQueryEncoder:
+    # same model and query-side encoding that qdrant-client applies to models.Document queries
+    def __init__(self, config: SparseQueryEncoderConfig, model: SparseTextEmbedding) -> None:
+        self._model = model
+        self._cache: LruCache[str, models.SparseVector] = LruCache(config.cache)
+
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    async def encode(self, query: str) -> models.SparseVector:
+        return (await self.encode_many([query]))[0]
+
+    async def encode_many(self, queries: list[str]) -> list[models.SparseVector]:
+        cached = [self._cache.get(query) for query in queries]
+
+        misses = list(dict.fromkeys(query for query, vector in zip(queries, cached, strict=True) if vector is None))
+        miss_map: dict[str, models.SparseVector] = {}
+        if misses:
+            # BM25 tokenization is CPU work, it should not block the event loop
+            for query, vector in zip(misses, await asyncio.to_thread(self._embed, misses), strict=True):
+                self._cache.put(query, vector)
+                miss_map[query] = vector
+
+        return [miss_map[query] if vector is None else vector for query, vector in zip(queries, cached, strict=True)]
+
+    def _embed(self, queries: list[str]) -> list[models.SparseVector]:
+        return [
+            models.SparseVector(indices=embedding.indices.tolist(), values=embedding.values.tolist())
+            for embedding in self._model.query_embed(queries)
+        ]
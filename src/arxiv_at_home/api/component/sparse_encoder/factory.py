@@ -0,0 +1,9 @@
+from fastembed import SparseTextEmbedding
+
+from arxiv_at_home.api.component.sparse_encoder.config import SparseQueryEncoderConfig
+from arxiv_at_home.api.component.sparse_encoder.encoder import SparseQueryEncoder
+from arxiv_at_home.common.qdrant.config import QDRANT_SPARSE_MODEL
+
+
+def create_sparse_query_encoder(config: SparseQueryEncoderConfig) -> SparseQueryEncoder:
+    return SparseQueryEncoder(config, model=SparseTextEmbedding(model_name=QDRANT_SPARSE_MODEL))
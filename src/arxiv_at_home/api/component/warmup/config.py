@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class WarmupConfig(BaseModel):
+    enabled: bool = True
+    batch_size: int = 8
+    # padded sequence lengths of the warmup batches: short queries for the dense model,
+    # query + candidate pairs (after the cached template prefix) for the reranker
+    query_sequence_lengths: list[int] = [16, 64]
+    rerank_sequence_lengths: list[int] = [128, 512]
@@ -0,0 +1,38 @@
+import asyncio
+
+import torch
+
+from arxiv_at_home.api.component.reranker.model import GenerativeReranker, RerankInputProcessor
+from arxiv_at_home.api.component.warmup.config import WarmupConfig
+from arxiv_at_home.common.dense.vectorizer import DenseVectorizer
+
+
+def _warm_up_vectorizer(config: WarmupConfig, vectorizer: DenseVectorizer) -> None:
+    # token values do not matter, kernels and allocations depend only on the shapes
+    for length in config.query_sequence_lengths:
+        vectorizer(
+            {
+                "input_ids": torch.zeros((config.batch_size, length), dtype=torch.long),
+                "attention_mask": torch.ones((config.batch_size, length), dtype=torch.long),
+            }
+        )
+
+
+def _warm_up_reranker(config: WarmupConfig, reranker: GenerativeReranker, processor: RerankInputProcessor) -> None:
+    for length in config.rerank_sequence_lengths:
+        reranker(processor.collate([[0] * length] * config.batch_size))
+
+
+async def warm_up_models(
+    config: WarmupConfig,
+    vectorizer: DenseVectorizer,
+    reranker: GenerativeReranker,
+    processor: RerankInputProcessor,
+) -> None:
+    if not config.enabled:
+        return
+
+    await asyncio.gather(
+        asyncio.to_thread(_warm_up_vectorizer, config, vectorizer),
+        asyncio.to_thread(_warm_up_reranker, config, reranker, processor),
+    )
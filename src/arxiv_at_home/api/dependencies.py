@@ -1,20 +1,40 @@
-from contextlib import asynccontextmanager
+import asyncio
+import contextlib
+import functools
+from contextlib import AbstractContextManager, asynccontextmanager
+from typing import Any
 
 from fastapi import FastAPI
 from qdrant_client import AsyncQdrantClient
 from starlette.types import Lifespan
 from tokenizers import Tokenizer
 
-from arxiv_at_home.api.component.citation_provider.base import CitationProvider
-from arxiv_at_home.api.component.citation_provider.factory import create_citation_provider
+from arxiv_at_home.api.component.cascade.cross_encoder import CascadeCrossEncoder
+from arxiv_at_home.api.component.cascade.factory import create_cascade_cross_encoder
+from arxiv_at_home.api.component.metrics.api import ApiMetrics
+from arxiv_at_home.api.component.paper_cache.cache import PaperMetadataCache
+from arxiv_at_home.api.component.paper_cache.factory import create_paper_metadata_cache
+from arxiv_at_home.api.component.query_encoder.encoder import QueryEncoder
+from arxiv_at_home.api.component.query_encoder.factory import create_query_encoder
+from arxiv_at_home.api.component.reranker.cache import RerankScoreCache
 from arxiv_at_home.api.component.reranker.factory import (
     create_rerank_processor,
+    create_rerank_scheduler,
+    create_rerank_score_cache,
     create_rerank_template,
     create_reranker,
 )
 from arxiv_at_home.api.component.reranker.model import GenerativeReranker, RerankInputProcessor
+from arxiv_at_home.api.component.reranker.scheduler import RerankScheduler
 from arxiv_at_home.api.component.reranker.template import RerankTemplate
+from arxiv_at_home.api.component.search_cursor.factory import create_search_cursor_store
+from arxiv_at_home.api.component.search_cursor.store import SearchCursorStore
+from arxiv_at_home.api.component.sparse_encoder.encoder import SparseQueryEncoder
+from arxiv_at_home.api.component.sparse_encoder.factory import create_sparse_query_encoder
+from arxiv_at_home.api.component.warmup.warmup import warm_up_models
 from arxiv_at_home.api.settings import ApiSettings
+from arxiv_at_home.common.citation_provider.base import CitationProvider
+from arxiv_at_home.common.citation_provider.factory import create_citation_provider
 from arxiv_at_home.common.database.manager import AsyncDatabaseManager, new_database_manager
 from arxiv_at_home.common.dense.factory import create_dense_template, create_dense_tokenizer, create_dense_vectorizer
 from arxiv_at_home.common.dense.template import DenseEncodingTemplate
@@ -26,44 +46,116 @@ class AppState:
     settings: ApiSettings
     qdrant: AsyncQdrantClient
     db_manager: AsyncDatabaseManager
+    paper_metadata_cache: PaperMetadataCache
 
     citation_provider: CitationProvider
+    metrics: ApiMetrics
 
     dense_vectorizer: DenseVectorizer
     dense_tokenizer: Tokenizer
     dense_template: DenseEncodingTemplate
+    query_encoder: QueryEncoder
+    sparse_query_encoder: SparseQueryEncoder
 
     reranker: GenerativeReranker
     reranker_processor: RerankInputProcessor
     reranker_template: RerankTemplate
+    reranker_scheduler: RerankScheduler
+    rerank_score_cache: RerankScoreCache
+    # None unless search.cascade uses the cross-encoder scorer
+    cascade_cross_encoder: CascadeCrossEncoder | None
+
+    search_cursors: SearchCursorStore
+
+    # models are loaded and warmed up, cleared again on shutdown
+    ready: bool = False
 
 
 _state = AppState()
 
 
+async def _enter_in_threads(stack: contextlib.ExitStack, *managers: AbstractContextManager) -> list[Any]:
+    # loading a model blocks on disk reads and weight transfers, so every model is loaded in its own thread
+    results = await asyncio.gather(*(asyncio.to_thread(x.__enter__) for x in managers), return_exceptions=True)
+
+    # models that did load are released even if another one failed
+    for manager, result in zip(managers, results, strict=True):
+        if not isinstance(result, BaseException):
+            stack.push(manager.__exit__)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return results
+
+
 def lifespan_factory(config: ApiSettings) -> Lifespan:
     @asynccontextmanager
     async def lifespan(app: FastAPI) -> None:
         _state.settings = config
+        _state.metrics = ApiMetrics()
         _state.qdrant = create_qdrant(config.qdrant)
+        _state.search_cursors = create_search_cursor_store(config.search.cursor)
 
         async with new_database_manager(config.database) as db_manager:
             _state.db_manager = db_manager
-            with (
-                create_dense_vectorizer(config.dense_vectorizer) as dense_vectorizer,
-                create_reranker(config.reranker) as reranker,
-            ):
+            _state.paper_metadata_cache = create_paper_metadata_cache(config.paper_cache)
+            _state.reranker_processor = create_rerank_processor(config.reranker)
+            with contextlib.ExitStack() as models:
+                dense_vectorizer, reranker, cascade_cross_encoder = await _enter_in_threads(
+                    models,
+                    create_dense_vectorizer(config.dense_vectorizer),
+                    create_reranker(config.reranker, processor=_state.reranker_processor),
+                    create_cascade_cross_encoder(config.search.cascade),
+                )
+                await warm_up_models(
+                    config.warmup, vectorizer=dense_vectorizer, reranker=reranker, processor=_state.reranker_processor
+                )
+
                 _state.dense_vectorizer = dense_vectorizer
                 _state.dense_tokenizer = create_dense_tokenizer(config.dense_vectorizer)
                 _state.dense_template = create_dense_template(config.dense_vectorizer)
+                _state.sparse_query_encoder = await asyncio.to_thread(
+                    create_sparse_query_encoder, config.sparse_query_encoder
+                )
 
                 _state.reranker = reranker
                 _state.reranker_template = create_rerank_template(config.reranker)
-                _state.reranker_processor = create_rerank_processor(config.reranker)
-
-                _state.citation_provider = create_citation_provider(config.citation_provider)
-
-                yield
+                _state.rerank_score_cache = create_rerank_score_cache(config.reranker)
+                _state.cascade_cross_encoder = cascade_cross_encoder
+
+                async with (
+                    create_query_encoder(
+                        config.query_encoder,
+                        dense_config=config.dense_vectorizer,
+                        vectorizer=dense_vectorizer,
+                        tokenizer=_state.dense_tokenizer,
+                        template=_state.dense_template,
+                        on_batch=functools.partial(_state.metrics.observe_model_batch, "query_encoder"),
+                    ) as query_encoder,
+                    create_rerank_scheduler(
+                        config.reranker,
+                        reranker=reranker,
+                        processor=_state.reranker_processor,
+                        on_batch=functools.partial(_state.metrics.observe_model_batch, "reranker"),
+                    ) as reranker_scheduler,
+                    contextlib.aclosing(
+                        create_citation_provider(
+                            config.citation_provider,
+                            db_manager=db_manager,
+                            on_refresh_failure=_state.metrics.observe_citation_refresh_failure,
+                        )
+                    ) as citation_provider,
+                ):
+                    _state.query_encoder = query_encoder
+                    _state.reranker_scheduler = reranker_scheduler
+                    _state.citation_provider = citation_provider
+
+                    _state.ready = True
+                    try:
+                        yield
+                    finally:
+                        _state.ready = False
 
     return lifespan
 
@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+import datetime as dt
+from enum import StrEnum
+
+from pydantic import BaseModel, field_validator
 
 from arxiv_at_home.common.dto import PaperMetadata
 
@@ -7,6 +10,21 @@ class SearchRequest(BaseModel):
     collection: str = "arxiv"
     query: str
     limit: int = 10
+    # papers having any of these categories
+    categories: set[str] | None = None
+    updated_after: dt.datetime | None = None
+    updated_before: dt.datetime | None = None
+
+    # next_cursor of the previous page; query and filters must be the same, limit is the page size
+    cursor: str | None = None
+
+    @field_validator("updated_after", "updated_before")
+    @classmethod
+    def assume_utc(cls, v: dt.datetime | None) -> dt.datetime | None:
+        # paper dates are naive UTC, comparing them with aware datetimes would fail
+        if v is not None and v.tzinfo is None:
+            return v.replace(tzinfo=dt.UTC)
+        return v
 
 
 class ScoredPaper(BaseModel):
@@ -17,8 +35,67 @@ class ScoredPaper(BaseModel):
 
 class SearchStats(BaseModel):
     time_taken_seconds: float
+    # wall time of each search stage, concurrent stages overlap
+    stage_seconds: dict[str, float]
+    num_candidates: int
+    # candidates that were not found in the rerank score cache
+    num_reranked: int
+    query_tokens: int
+    rerank_tokens: int
 
 
 class SearchResponse(BaseModel):
     results: list[ScoredPaper]
     stats: SearchStats
+    # absent on the last page
+    next_cursor: str | None = None
+
+
+class BatchSearchRequest(BaseModel):
+    requests: list[SearchRequest]
+
+
+class BatchSearchResponse(BaseModel):
+    # in the order of requests
+    results: list[list[ScoredPaper]]
+    # aggregated over the whole batch
+    stats: SearchStats
+
+
+class SearchStreamStage(StrEnum):
+    # candidates in retrieval (DBSF fusion) order, before reranking; citations are not fetched yet
+    fused = "fused"
+    # final reranked and boosted ordering
+    reranked = "reranked"
+    error = "error"
+
+
+class SearchStreamEvent(BaseModel):
+    stage: SearchStreamStage
+    results: list[ScoredPaper] = []
+    stats: SearchStats | None = None
+    detail: str | None = None
+
+
+class BatchingStats(BaseModel):
+    queue_depth: int
+    batches_processed: int
+    items_processed: int
+    mean_batch_size: float
+    mean_fill_ratio: float
+
+
+class CachingStats(BaseModel):
+    size: int
+    hits: int
+    misses: int
+
+
+class ServiceStatsResponse(BaseModel):
+    query_encoder: BatchingStats
+    query_embedding_cache: CachingStats
+    query_sparse_vector_cache: CachingStats
+    reranker: BatchingStats
+    rerank_score_cache: CachingStats
+    paper_metadata_cache: CachingStats
+    search_cursor_cache: CachingStats
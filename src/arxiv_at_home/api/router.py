@@ -1,9 +1,25 @@
+import asyncio
+import dataclasses
+from collections.abc import AsyncGenerator
 from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from arxiv_at_home.api.component.search_cursor.store import InvalidSearchCursorError
 from arxiv_at_home.api.dependencies import AppState, get_app_state
-from arxiv_at_home.api.dto import SearchRequest, SearchResponse
+from arxiv_at_home.api.dto import (
+    BatchingStats,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    CachingStats,
+    SearchRequest,
+    SearchResponse,
+    SearchStreamEvent,
+    SearchStreamStage,
+    ServiceStatsResponse,
+)
 from arxiv_at_home.api.service.search import SearchService
 from arxiv_at_home.common.database.repository import PaperMetadataRepository
 
@@ -22,9 +38,122 @@ async def search_papers(
             paper_metadata_repository=PaperMetadataRepository(sess),
         )
 
-        return await service.search(request)
+        try:
+            return await service.search(request)
+        except TimeoutError as e:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Search timed out") from e
+        except InvalidSearchCursorError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_papers_batch(
+    request: BatchSearchRequest,
+    state: AppState = Depends(get_app_state),  # noqa: B008
+) -> BatchSearchResponse:
+    if not request.requests:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No search requests given")
+    if len(request.requests) > state.settings.search.max_batch_requests:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {state.settings.search.max_batch_requests} search requests are allowed per batch",
+        )
+    if any(x.cursor is not None for x in request.requests):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Cursors are only supported by /search"
+        )
+
+    async with state.db_manager.session() as sess:
+        service = SearchService(
+            config=state.settings.search,
+            state=state,
+            paper_metadata_repository=PaperMetadataRepository(sess),
+        )
+
+        try:
+            return await service.search_batch(request.requests)
+        except TimeoutError as e:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Search timed out") from e
+
+
+@router.post("/search/stream", response_class=StreamingResponse)
+async def search_papers_stream(
+    request: SearchRequest,
+    state: AppState = Depends(get_app_state),  # noqa: B008
+) -> StreamingResponse:
+    if request.cursor is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Cursors are only supported by /search"
+        )
+
+    # NDJSON stream: one SearchStreamEvent per line
+    async def generate_events() -> AsyncGenerator[str, None]:
+        # no request session, it would stay open while the client reads the stream; hydration opens its own
+        service = SearchService(config=state.settings.search, state=state, paper_metadata_repository=None)
+
+        try:
+            async for event in service.search_stream(request):
+                yield event.model_dump_json() + "\n"
+        except TimeoutError:
+            # status code is already sent at this point
+            error = SearchStreamEvent(stage=SearchStreamStage.error, detail="Search timed out")
+            yield error.model_dump_json() + "\n"
+
+    return StreamingResponse(generate_events(), media_type="application/x-ndjson")
 
 
 @router.get("/health")
 async def health_check() -> Any:
     return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness_check(
+    state: AppState = Depends(get_app_state),  # noqa: B008
+) -> Any:
+    # liveness is /health, this one tells load balancers whether requests can be served
+    if not state.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Models are not loaded yet")
+
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(state.qdrant.get_collections(), state.db_manager.ping()),
+            timeout=state.settings.serving.readiness_timeout_seconds,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Dependency check failed: {e!r}"
+        ) from e
+
+    return {"status": "ready"}
+
+
+@router.get("/stats", response_model=ServiceStatsResponse)
+async def service_stats(
+    state: AppState = Depends(get_app_state),  # noqa: B008
+) -> ServiceStatsResponse:
+    return ServiceStatsResponse(
+        query_encoder=BatchingStats(**dataclasses.asdict(state.query_encoder.stats())),
+        query_embedding_cache=CachingStats(**dataclasses.asdict(state.query_encoder.cache_stats())),
+        query_sparse_vector_cache=CachingStats(**dataclasses.asdict(state.sparse_query_encoder.cache_stats())),
+        reranker=BatchingStats(**dataclasses.asdict(state.reranker_scheduler.stats())),
+        rerank_score_cache=CachingStats(**dataclasses.asdict(state.rerank_score_cache.stats())),
+        paper_metadata_cache=CachingStats(**dataclasses.asdict(state.paper_metadata_cache.stats())),
+        search_cursor_cache=CachingStats(**dataclasses.asdict(state.search_cursors.stats())),
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(
+    state: AppState = Depends(get_app_state),  # noqa: B008
+) -> PlainTextResponse:
+    state.metrics.update_scheduler("query_encoder", state.query_encoder.stats())
+    state.metrics.update_scheduler("reranker", state.reranker_scheduler.stats())
+    state.metrics.update_cache("query_embedding", state.query_encoder.cache_stats())
+    state.metrics.update_cache("query_sparse_vector", state.sparse_query_encoder.cache_stats())
+    state.metrics.update_cache("rerank_score", state.rerank_score_cache.stats())
+    state.metrics.update_cache("paper_metadata", state.paper_metadata_cache.stats())
+    state.metrics.update_cache("search_cursor", state.search_cursors.stats())
+    state.metrics.update_db_pool(state.db_manager.pool_status())
+
+    return PlainTextResponse(state.metrics.render(), media_type=CONTENT_TYPE_LATEST)
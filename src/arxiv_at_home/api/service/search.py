@@ -1,176 +1,760 @@
-import math
-import re
-import time
+import asyncio
+import contextlib
+import datetime as dt
+from collections.abc import AsyncGenerator, AsyncIterator
+from typing import cast
 
-import torch
+import numpy as np
 from qdrant_client import models
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
+from arxiv_at_home.api.component.cascade.config import CascadeScorer
+from arxiv_at_home.api.component.cascade.cross_encoder import CascadeCrossEncoder
+from arxiv_at_home.api.component.reranker.cache import normalize_rerank_query
+from arxiv_at_home.api.component.search_cursor.store import RankedCandidate, SearchCursorEntry
 from arxiv_at_home.api.dependencies import AppState
-from arxiv_at_home.api.dto import ScoredPaper, SearchRequest, SearchResponse, SearchStats
-from arxiv_at_home.api.settings import SearchConfig
+from arxiv_at_home.api.dto import (
+    BatchSearchResponse,
+    ScoredPaper,
+    SearchRequest,
+    SearchResponse,
+    SearchStats,
+    SearchStreamEvent,
+    SearchStreamStage,
+)
+from arxiv_at_home.api.service.trace import SearchTrace
+from arxiv_at_home.api.settings import HydrationSource, PinnedTitleRerank, SearchConfig
 from arxiv_at_home.common.database.repository import PaperMetadataRepository
-from arxiv_at_home.common.dense.vectorizer import VectorizerInputs
-from arxiv_at_home.common.dto import PaperMetadata
-from arxiv_at_home.common.qdrant.config import QDRANT_SPARSE_MODEL
-
-_RE_NOT_WORD = re.compile(r"[^A-Za-z0-9]")
+from arxiv_at_home.common.dto import PaperMetadata, normalize_title
+from arxiv_at_home.common.qdrant.config import QDRANT_PAPER_METADATA_PAYLOAD
+
+
+def _top_k_indices(scores: np.ndarray, indices: np.ndarray, k: int) -> np.ndarray:
+    # descending by score, equal scores keep the candidate order
+    if k <= 0:
+        return indices[:0]
+    if k < len(indices):
+        negated = -scores[indices]
+        # argpartition would keep an arbitrary subset of the candidates tied with the k-th score,
+        # so all of them go into the sort and the first ones in candidate order survive the cut
+        indices = indices[negated <= np.partition(negated, k - 1)[k - 1]]
+    return indices[np.lexsort((indices, -scores[indices]))][:k]
+
+
+def _ranked_candidates(results: list[ScoredPaper], keep_papers: bool) -> list[RankedCandidate]:
+    return [
+        RankedCandidate(
+            fully_qualified_name=x.paper.fully_qualified_name,
+            score=x.score,
+            citations=x.citations,
+            paper=x.paper if keep_papers else None,
+        )
+        for x in results
+    ]
 
 
 class SearchService:
     def __init__(
-        self, config: SearchConfig, state: AppState, paper_metadata_repository: PaperMetadataRepository
+        self, config: SearchConfig, state: AppState, paper_metadata_repository: PaperMetadataRepository | None
     ) -> None:
         self._config = config
         self._qdrant = state.qdrant
-        self._dense_vectorizer = state.dense_vectorizer
-        self._dense_tokenizer = state.dense_tokenizer
-        self._dense_template = state.dense_template
+        self._query_encoder = state.query_encoder
+        self._sparse_query_encoder = state.sparse_query_encoder
 
         self._repo = paper_metadata_repository
+        self._db_manager = state.db_manager
+        self._paper_cache = state.paper_metadata_cache
 
-        self._reranker = state.reranker
-        self._reranker_processor = state.reranker_processor
+        self._reranker_scheduler = state.reranker_scheduler
         self._reranker_template = state.reranker_template
+        self._rerank_score_cache = state.rerank_score_cache
 
         self._citation_provider = state.citation_provider
+        self._cascade_cross_encoder = state.cascade_cross_encoder
+        cascade = config.cascade
+        if (
+            cascade.rerank_more_times is not None
+            and cascade.scorer == CascadeScorer.cross_encoder
+            and self._cascade_cross_encoder is None
+        ):
+            raise ValueError("The cross_encoder cascade scorer requires a loaded cross-encoder")
+        # query embeddings of this request, reused by the dense cascade scorer
+        self._query_vectors: dict[str, list[float]] = {}
+
+        self._metrics = state.metrics
+        self._cursors = state.search_cursors
+
+    async def _vectorize_queries(self, texts: list[str], trace: SearchTrace) -> list[list[float]]:
+        encoded = await self._query_encoder.encode_many(texts)
+        trace.query_tokens += sum(x.n_tokens for x in encoded)
+        self._query_vectors.update((text, x.embedding) for text, x in zip(texts, encoded, strict=True))
+        return [x.embedding for x in encoded]
+
+    def _candidate_filter(self, request: SearchRequest) -> models.Filter | None:
+        conditions: list[models.Condition] = []
+        if request.categories:
+            conditions.append(
+                models.FieldCondition(key="categories", match=models.MatchAny(any=list(request.categories)))
+            )
+        if request.updated_after is not None or request.updated_before is not None:
+            conditions.append(
+                models.FieldCondition(
+                    key="updated_at", range=models.DatetimeRange(gte=request.updated_after, lt=request.updated_before)
+                )
+            )
+        return models.Filter(must=conditions) if conditions else None
+
+    def _dense_search_params(self) -> models.SearchParams:
+        config = self._config.dense_search
+        return models.SearchParams(
+            hnsw_ef=config.hnsw_ef,
+            exact=config.exact,
+            quantization=models.QuantizationSearchParams(
+                ignore=config.ignore_quantization,
+                rescore=config.quantization_rescore,
+                oversampling=config.quantization_oversampling,
+            ),
+        )
 
-    def _vectorize_query(self, text: str) -> list[float]:
-        encoding = self._dense_tokenizer.encode(self._dense_template.template_query(text))
-
-        inputs: VectorizerInputs = {
-            "input_ids": torch.tensor([encoding.ids], dtype=torch.long),
-            "attention_mask": torch.tensor([encoding.attention_mask], dtype=torch.long),
-        }
+    def _matches_filter(self, request: SearchRequest, paper: PaperMetadata) -> bool:
+        # same conditions as _candidate_filter, for papers that did not come from Qdrant
+        if request.categories and not paper.categories.intersection(request.categories):
+            return False
+        # filter bounds are UTC-aware (see SearchRequest), synced dates are naive UTC
+        updated_at = (
+            paper.updated_at if paper.updated_at.tzinfo is not None else paper.updated_at.replace(tzinfo=dt.UTC)
+        )
+        if request.updated_after is not None and updated_at < request.updated_after:
+            return False
+        return request.updated_before is None or updated_at < request.updated_before
+
+    def _candidate_prefetch(
+        self,
+        dense_vector: list[float],
+        sparse_vector: models.SparseVector,
+        limit: int,
+        query_filter: models.Filter | None,
+    ) -> list[models.Prefetch]:
+        prefetch_limit = limit * self._config.prefetch_more_times
 
-        embeddings = self._dense_vectorizer(inputs)
-        return embeddings[0].tolist()
+        return [
+            models.Prefetch(
+                query=dense_vector,
+                using="metadata/dense",
+                filter=query_filter,
+                params=self._dense_search_params(),
+                limit=prefetch_limit,
+            ),
+            models.Prefetch(
+                query=sparse_vector,
+                using="abstract/sparse",
+                filter=query_filter,
+                limit=prefetch_limit,
+            ),
+            models.Prefetch(
+                query=sparse_vector,
+                using="title/sparse",
+                filter=query_filter,
+                limit=prefetch_limit,
+            ),
+        ]
 
     async def _retrieve_candidates(
-        self, collection_name: str, query_text: str, query_vector: list[float], limit: int
+        self,
+        collection_name: str,
+        dense_vector: list[float],
+        sparse_vector: models.SparseVector,
+        limit: int,
+        query_filter: models.Filter | None,
     ) -> list[models.ScoredPoint]:
-        prefetch_limit = limit * self._config.prefetch_more_times
-
         search_result = await self._qdrant.query_points(
             collection_name=collection_name,
-            prefetch=[
-                models.Prefetch(
-                    query=query_vector,
-                    using="metadata/dense",
-                    limit=prefetch_limit,
-                ),
-                models.Prefetch(
-                    query=models.Document(text=query_text, model=QDRANT_SPARSE_MODEL),
-                    using="abstract/sparse",
-                    limit=prefetch_limit,
-                ),
-                models.Prefetch(
-                    query=models.Document(text=query_text, model=QDRANT_SPARSE_MODEL),
-                    using="title/sparse",
-                    limit=prefetch_limit,
-                ),
-            ],
+            prefetch=self._candidate_prefetch(dense_vector, sparse_vector, limit, query_filter),
             query=models.FusionQuery(fusion=models.Fusion.DBSF),
-            limit=prefetch_limit,
-            with_payload=["fully_qualified_name"],
+            limit=limit * self._config.prefetch_more_times,
+            with_payload=self._payload_fields(),
+            with_vectors=self._candidate_vectors(),
         )
         return search_result.points
 
+    async def _retrieve_candidates_batch(
+        self,
+        requests: list[SearchRequest],
+        dense_vectors: list[list[float]],
+        sparse_vectors: list[models.SparseVector],
+    ) -> list[list[models.ScoredPoint]]:
+        by_collection: dict[str, list[int]] = {}
+        for i, request in enumerate(requests):
+            by_collection.setdefault(request.collection, []).append(i)
+
+        async def _query_collection(collection_name: str, indices: list[int]) -> list[models.QueryResponse]:
+            return await self._qdrant.query_batch_points(
+                collection_name=collection_name,
+                requests=[
+                    models.QueryRequest(
+                        prefetch=self._candidate_prefetch(
+                            dense_vectors[i],
+                            sparse_vectors[i],
+                            requests[i].limit,
+                            self._candidate_filter(requests[i]),
+                        ),
+                        query=models.FusionQuery(fusion=models.Fusion.DBSF),
+                        limit=requests[i].limit * self._config.prefetch_more_times,
+                        with_payload=self._payload_fields(),
+                        with_vector=self._candidate_vectors(),
+                    )
+                    for i in indices
+                ],
+            )
+
+        # one round trip per collection
+        responses = await asyncio.gather(*(_query_collection(name, indices) for name, indices in by_collection.items()))
+
+        points: list[list[models.ScoredPoint]] = [[] for _ in requests]
+        for indices, collection_responses in zip(by_collection.values(), responses, strict=True):
+            for i, response in zip(indices, collection_responses, strict=True):
+                points[i] = response.points
+        return points
+
+    def _payload_fields(self) -> list[str]:
+        if self._config.hydration == HydrationSource.payload:
+            return ["fully_qualified_name", QDRANT_PAPER_METADATA_PAYLOAD]
+        return ["fully_qualified_name"]
+
+    def _candidate_vectors(self) -> list[str] | bool:
+        cascade = self._config.cascade
+        if cascade.rerank_more_times is not None and cascade.scorer == CascadeScorer.dense:
+            return ["metadata/dense"]
+        return False
+
     async def _hydrate_documents(self, points: list[models.ScoredPoint]) -> list[PaperMetadata]:
         if not points:
             return []
 
         fqns = [point.payload["fully_qualified_name"] for point in points]
-        return await self._repo.get_by_ids(fqns)
+        papers = {
+            point.payload["fully_qualified_name"]: PaperMetadata.model_validate(
+                point.payload[QDRANT_PAPER_METADATA_PAYLOAD]
+            )
+            for point in points
+            if QDRANT_PAPER_METADATA_PAYLOAD in point.payload
+        }
+
+        # points indexed without the full payload go through the cache
+        papers.update(await self._load_papers([fqn for fqn in fqns if fqn not in papers]))
 
-    async def _fetch_citation_metadata(self, documents: list[PaperMetadata]) -> dict[str, int | None]:
+        return [papers[fqn] for fqn in fqns if fqn in papers]
+
+    @contextlib.asynccontextmanager
+    async def _paper_repository(self) -> AsyncIterator[PaperMetadataRepository]:
+        if self._repo is not None:
+            yield self._repo
+            return
+
+        # without a request session (streamed searches) every lookup holds a session only while it runs
+        async with self._db_manager.session() as session:
+            yield PaperMetadataRepository(session)
+
+    async def _load_papers(self, fqns: list[str]) -> dict[str, PaperMetadata]:
+        async with self._paper_repository() as repo:
+            papers = await self._paper_cache.lookup(fqns, repo)
+
+            # only papers missing from the cache go to the database
+            misses = [fqn for fqn in fqns if fqn not in papers]
+            if misses:
+                fetched = await repo.get_by_ids_with_sync_time(misses)
+                self._paper_cache.store(fetched)
+                papers.update((paper.fully_qualified_name, paper) for paper, _ in fetched)
+
+        return papers
+
+    async def _hydrate_documents_batch(self, points: list[list[models.ScoredPoint]]) -> list[list[PaperMetadata]]:
+        # candidate lists of different queries overlap, so hydrate their union once
+        union = await self._hydrate_documents(
+            list({point.payload["fully_qualified_name"]: point for batch in points for point in batch}.values())
+        )
+        paper_map = {paper.fully_qualified_name: paper for paper in union}
+
+        return [
+            [
+                paper_map[point.payload["fully_qualified_name"]]
+                for point in batch
+                if point.payload["fully_qualified_name"] in paper_map
+            ]
+            for batch in points
+        ]
+
+    async def _fetch_citation_metadata(
+        self, documents: list[PaperMetadata], trace: SearchTrace
+    ) -> dict[str, int | None]:
         if not documents:
             return {}
 
-        counts = await self._citation_provider.get_citation_count_batch([doc.fully_qualified_name for doc in documents])
+        try:
+            counts = await trace.run_stage(
+                "citations",
+                self._citation_provider.get_citation_count_batch([doc.fully_qualified_name for doc in documents]),
+                self._config.deadlines.citations,
+            )
+        except TimeoutError:
+            # slow citation provider should not add its latency to every request
+            return {}
 
         return counts
 
-    def _rerank_documents(self, query: str, documents: list[PaperMetadata]) -> list[float]:
-        if not documents:
+    async def _cascade_scores(
+        self, query: str, documents: list[PaperMetadata], points: list[models.ScoredPoint]
+    ) -> list[float]:
+        match self._config.cascade.scorer:
+            case CascadeScorer.fusion:
+                return self._fusion_scores(documents, points)
+            case CascadeScorer.dense:
+                # both sides are normalized, so this is the cosine similarity
+                vectors = {point.payload["fully_qualified_name"]: point.vector["metadata/dense"] for point in points}
+                query_vector = np.asarray(self._query_vectors[query], dtype=np.float32)
+                return [
+                    float(np.dot(query_vector, vectors[doc.fully_qualified_name]))
+                    if doc.fully_qualified_name in vectors
+                    else -np.inf
+                    for doc in documents
+                ]
+            case CascadeScorer.cross_encoder:
+                # checked in __init__, the encoder is loaded whenever this scorer is used
+                cross_encoder = cast(CascadeCrossEncoder, self._cascade_cross_encoder)
+                return await cross_encoder.score(query, documents)
+            case _:
+                raise ValueError(f"Unknown cascade scorer: {self._config.cascade.scorer}")
+
+    async def _prune_candidates(
+        self,
+        requests: list[SearchRequest],
+        points: list[list[models.ScoredPoint]],
+        papers: list[list[PaperMetadata]],
+        pinned: list[set[str]],
+        trace: SearchTrace,
+    ) -> list[list[PaperMetadata]]:
+        more_times = self._config.cascade.rerank_more_times
+        if more_times is None:
+            return papers
+
+        depths = [request.limit * more_times for request in requests]
+        prune_indices = [i for i, (depth, x) in enumerate(zip(depths, papers, strict=True)) if len(x) > depth]
+        if not prune_indices:
+            return papers
+
+        with trace.measure("cascade"):
+            scores = await asyncio.gather(
+                *(self._cascade_scores(requests[i].query, papers[i], points[i]) for i in prune_indices)
+            )
+
+        papers = list(papers)
+        for i, cascade_scores in zip(prune_indices, scores, strict=True):
+            # pinned title matches always survive, the rest keeps its fusion order
+            request_scores = np.asarray(cascade_scores, dtype=np.float64)
+            is_pinned = np.array([paper.fully_qualified_name in pinned[i] for paper in papers[i]])
+            keep = np.concatenate(
+                [
+                    np.flatnonzero(is_pinned),
+                    _top_k_indices(request_scores, np.flatnonzero(~is_pinned), max(depths[i] - is_pinned.sum(), 0)),
+                ]
+            )
+            papers[i] = [papers[i][j] for j in np.sort(keep).tolist()]
+        return papers
+
+    async def _rerank_documents(
+        self, queries: list[str], documents: list[list[PaperMetadata]], trace: SearchTrace
+    ) -> list[list[float]]:
+        queries = [normalize_rerank_query(query) for query in queries]
+        cached = [
+            self._rerank_score_cache.lookup(query, query_documents)
+            for query, query_documents in zip(queries, documents, strict=True)
+        ]
+
+        # only cache misses go through the model, pairs of all queries are scored in one submission
+        misses = [
+            (query_idx, doc_idx)
+            for query_idx, query_scores in enumerate(cached)
+            for doc_idx, score in enumerate(query_scores)
+            if score is None
+        ]
+        miss_scores: dict[tuple[int, int], float] = {}
+        if misses:
+            templates = [
+                self._reranker_template.format(queries[query_idx], documents[query_idx][doc_idx])
+                for query_idx, doc_idx in misses
+            ]
+            scored = await self._reranker_scheduler.score(templates)
+
+            trace.num_reranked += len(misses)
+            trace.rerank_tokens += scored.n_tokens
+
+            miss_scores = dict(zip(misses, scored.scores, strict=True))
+            miss_indices: dict[int, list[int]] = {}
+            for query_idx, doc_idx in misses:
+                miss_indices.setdefault(query_idx, []).append(doc_idx)
+
+            for query_idx, doc_indices in miss_indices.items():
+                self._rerank_score_cache.store(
+                    queries[query_idx],
+                    [documents[query_idx][i] for i in doc_indices],
+                    [miss_scores[query_idx, i] for i in doc_indices],
+                )
+
+        # every pair is either a cache hit or was just scored
+        return [
+            [
+                score if score is not None else miss_scores[query_idx, doc_idx]
+                for doc_idx, score in enumerate(query_scores)
+            ]
+            for query_idx, query_scores in enumerate(cached)
+        ]
+
+    async def _compute_semantic_scores(
+        self,
+        queries: list[str],
+        documents: list[list[PaperMetadata]],
+        points: list[list[models.ScoredPoint]],
+        trace: SearchTrace,
+    ) -> list[list[float]]:
+        if not queries:
             return []
 
-        templates = [self._reranker_template.format(query, doc) for doc in documents]
-        inputs = self._reranker_processor.encode(templates)
-        results = self._reranker(inputs)
-        return results
+        try:
+            return await trace.run_stage(
+                "rerank", self._rerank_documents(queries, documents, trace), self._config.deadlines.rerank
+            )
+        except TimeoutError:
+            # fall back to the retrieval (fusion) scores
+            return [
+                self._fusion_scores(query_documents, query_points)
+                for query_documents, query_points in zip(documents, points, strict=True)
+            ]
+
+    def _fusion_scores(self, documents: list[PaperMetadata], points: list[models.ScoredPoint]) -> list[float]:
+        # pinned papers may be missing from the retrieved points
+        fusion_scores = {point.payload["fully_qualified_name"]: point.score for point in points}
+        return [fusion_scores.get(doc.fully_qualified_name, 0.0) for doc in documents]
+
+    def _title_lookup_enabled(self) -> bool:
+        enabled = self._config.title_lookup.enabled
+        if enabled is None:
+            return self._config.hydration != HydrationSource.payload
+        return enabled
+
+    async def _lookup_titles(self, requests: list[SearchRequest], trace: SearchTrace) -> list[list[PaperMetadata]]:
+        config = self._config.title_lookup
+        if not self._title_lookup_enabled():
+            return [[] for _ in requests]
+
+        # too short queries are left empty, which the repository skips
+        titles = [normalize_title(request.query) for request in requests]
+        queries = [
+            (request.collection, title if len(title) >= config.min_query_length else "")
+            for request, title in zip(requests, titles, strict=True)
+        ]
+        if not any(title for _, title in queries):
+            return [[] for _ in requests]
+
+        # a title starting with the query only reaches fuzz.ratio t up to len(query) * (2 / t - 1) characters
+        threshold = self._config.title_match_boost_threshold
+        max_length_factor = 2 / threshold - 1 if threshold > 0 else None
+
+        # runs concurrently with retrieval and hydration, so it cannot share the request session
+        with trace.measure("title_lookup"):
+            async with self._db_manager.session() as session:
+                candidates = await PaperMetadataRepository(session).find_by_title_prefixes(
+                    queries, limit=config.max_candidates, max_length_factor=max_length_factor
+                )
+
+        pinned = []
+        for request, request_candidates in zip(requests, candidates, strict=True):
+            ratios = {
+                paper.fully_qualified_name: self._title_match_ratio(paper, request.query)
+                for paper in request_candidates
+            }
+            matched = [
+                x
+                for x in request_candidates
+                if ratios[x.fully_qualified_name] >= self._config.title_match_boost_threshold
+                and self._matches_filter(request, x)
+            ]
+            matched.sort(key=lambda x: ratios[x.fully_qualified_name], reverse=True)
+            pinned.append(matched)
+
+        return pinned
 
     def _title_match_ratio(self, meta: PaperMetadata, query: str) -> float:
-        query_norm = " ".join(_RE_NOT_WORD.sub(" ", query.lower()).split())
-        title_norm = " ".join(_RE_NOT_WORD.sub(" ", meta.title.lower()).split())
-        text_ratio = fuzz.ratio(query_norm, title_norm)
+        text_ratio = fuzz.ratio(normalize_title(query), meta.normalized_title)
         return text_ratio / 100.0
 
-    def _calculate_total_score(
-        self, semantic_score: float, citation_count: int | None, title_match_ratio: float
-    ) -> float:
-        if citation_count is None:
-            citation_count = 0
-
-        citation_factor = math.log10(citation_count + 1)
-        citation_boost = 1 + (self._config.citation_boost_weight * citation_factor)
-
-        if title_match_ratio >= self._config.title_match_boost_threshold:
-            title_match_boost = self._config.title_match_boost_weight * title_match_ratio
-        else:
-            title_match_boost = 1.0
-
-        return semantic_score * citation_boost * title_match_boost
-
     def _apply_ranking_and_sort(
-        self, query: str, documents: list[PaperMetadata], citation_map: dict[str, int | None], limit: int
+        self,
+        query: str,
+        documents: list[PaperMetadata],
+        semantic_scores: list[float],
+        citation_map: dict[str, int | None],
+        limit: int,
+        pinned: set[str],
     ) -> list[ScoredPaper]:
         if not documents:
             return []
 
-        # 1. Get Semantic Ranks (Cross-Encoder)
-        semantic_scores = self._rerank_documents(query=query, documents=documents)
+        # Lookup Citations (may be missing if citation provider did not answer in time)
+        citations = [citation_map.get(paper.fully_qualified_name) for paper in documents]
+        citation_counts = np.array([x or 0 for x in citations], dtype=np.float64)
+        citation_boost = 1 + self._config.citation_boost_weight * np.log10(citation_counts + 1)
+
+        # Calculate Title Match Ratio
+        title_match_ratio = (
+            process.cdist(
+                [normalize_title(query)],
+                [paper.normalized_title for paper in documents],
+                scorer=fuzz.ratio,
+                dtype=np.float64,
+            )[0]
+            / 100.0
+        )
+        title_match_boost = np.where(
+            title_match_ratio >= self._config.title_match_boost_threshold,
+            self._config.title_match_boost_weight * title_match_ratio,
+            1.0,
+        )
 
-        scored_papers = []
-        for paper, semantic_score in zip(documents, semantic_scores, strict=True):
-            # Lookup Citations
-            citations = citation_map[paper.fully_qualified_name]
+        # Calculate Final Score
+        scores = np.asarray(semantic_scores, dtype=np.float64) * citation_boost * title_match_boost
 
-            # Calculate Title Match Ratio
-            title_match_ratio = self._title_match_ratio(paper, query)
+        # Select top-k (title matches first) and sort only them
+        is_pinned = np.array([paper.fully_qualified_name in pinned for paper in documents])
+        top_pinned = _top_k_indices(scores, np.flatnonzero(is_pinned), limit)
+        top = np.concatenate([top_pinned, _top_k_indices(scores, np.flatnonzero(~is_pinned), limit - len(top_pinned))])
 
-            # Calculate Final Score
-            final_score = self._calculate_total_score(semantic_score, citations, title_match_ratio)
+        return [ScoredPaper(paper=documents[i], citations=citations[i], score=float(scores[i])) for i in top.tolist()]
 
-            scored_papers.append(ScoredPaper(paper=paper, citations=citations, score=final_score))
+    def _fused_results(
+        self, points: list[models.ScoredPoint], documents: list[PaperMetadata], limit: int
+    ) -> list[ScoredPaper]:
+        # hydration keeps the retrieval order (after pinned title matches), so this is the DBSF ordering
+        documents = documents[:limit]
+        return [
+            ScoredPaper(paper=paper, citations=None, score=score)
+            for paper, score in zip(documents, self._fusion_scores(documents, points), strict=True)
+        ]
+
+    async def _retrieve_points(
+        self, requests: list[SearchRequest], trace: SearchTrace
+    ) -> list[list[models.ScoredPoint]]:
+        deadlines = self._config.deadlines
 
-        # 4. Sort
-        scored_papers.sort(key=lambda x: x.score, reverse=True)
+        # 1. Prepare Query
+        dense_vectors = await trace.run_stage(
+            "embed", self._vectorize_queries([request.query for request in requests], trace), deadlines.embed
+        )
 
-        return scored_papers[:limit]
+        # BM25 query vector is shared by both sparse prefetches
+        with trace.measure("sparse_embed"):
+            sparse_vectors = await self._sparse_query_encoder.encode_many([request.query for request in requests])
 
-    async def search(self, request: SearchRequest) -> SearchResponse:
-        start_time = time.perf_counter()
+        # 2. Retrieve Candidates (Qdrant)
+        if len(requests) == 1:
+            retrieve = self._retrieve_candidates(
+                collection_name=requests[0].collection,
+                dense_vector=dense_vectors[0],
+                sparse_vector=sparse_vectors[0],
+                limit=requests[0].limit,
+                query_filter=self._candidate_filter(requests[0]),
+            )
+            points = [await trace.run_stage("retrieve", retrieve, deadlines.retrieve)]
+        else:
+            points = await trace.run_stage(
+                "retrieve", self._retrieve_candidates_batch(requests, dense_vectors, sparse_vectors), deadlines.retrieve
+            )
 
-        # 1. Prepare Query
-        dense_vector = self._vectorize_query(request.query)
+        return points
 
-        # 2. Retrieve Candidates (Qdrant)
-        points = await self._retrieve_candidates(
-            collection_name=request.collection, query_text=request.query, query_vector=dense_vector, limit=request.limit
+    async def _retrieve_and_hydrate(
+        self, requests: list[SearchRequest], trace: SearchTrace
+    ) -> tuple[list[list[models.ScoredPoint]], list[list[PaperMetadata]], list[set[str]]]:
+        deadlines = self._config.deadlines
+
+        # 0. Title Lookup (Database), concurrently with embedding and retrieval
+        pinned, points = await asyncio.gather(
+            self._lookup_titles(requests, trace), self._retrieve_points(requests, trace)
         )
 
         # 3. Hydrate Data (Database)
-        papers = await self._hydrate_documents(points)
+        papers = await trace.run_stage("hydrate", self._hydrate_documents_batch(points), deadlines.hydrate)
+
+        for i, (request, request_pinned) in enumerate(zip(requests, pinned, strict=True)):
+            if not request_pinned:
+                continue
+            pinned_fqns = {paper.fully_qualified_name for paper in request_pinned}
+            papers[i] = request_pinned + [x for x in papers[i] if x.fully_qualified_name not in pinned_fqns]
+            if self._config.title_lookup.rerank == PinnedTitleRerank.truncate:
+                papers[i] = papers[i][: request.limit]
+
+        trace.num_candidates = sum(len(x) for x in papers)
+
+        return points, papers, [{paper.fully_qualified_name for paper in x} for x in pinned]
+
+    async def _rank(
+        self,
+        requests: list[SearchRequest],
+        points: list[list[models.ScoredPoint]],
+        papers: list[list[PaperMetadata]],
+        pinned: list[set[str]],
+        trace: SearchTrace,
+        full_ranking: bool = False,
+    ) -> list[list[ScoredPaper]]:
+        papers = await self._prune_candidates(requests, points, papers, pinned, trace)
+        unique_papers = list({paper.fully_qualified_name: paper for batch in papers for paper in batch}.values())
+
+        semantic_scores = [
+            self._fusion_scores(request_papers, request_points)
+            for request_papers, request_points in zip(papers, points, strict=True)
+        ]
+        skip_rerank = self._config.title_lookup.rerank == PinnedTitleRerank.skip
+        rerank_indices = [i for i, request_pinned in enumerate(pinned) if not (skip_rerank and request_pinned)]
+
+        # 4. Fetch Citation Metadata (it may be some external provider) and Rerank (Cross-Encoder) concurrently
+        citation_map, reranked_scores = await asyncio.gather(
+            self._fetch_citation_metadata(unique_papers, trace),
+            self._compute_semantic_scores(
+                [requests[i].query for i in rerank_indices],
+                [papers[i] for i in rerank_indices],
+                [points[i] for i in rerank_indices],
+                trace,
+            ),
+        )
+        for i, scores in zip(rerank_indices, reranked_scores, strict=True):
+            semantic_scores[i] = scores
+
+        # 5. Boost and Sort (Citation Boost + Title Match Boost)
+        with trace.measure("ranking"):
+            return [
+                self._apply_ranking_and_sort(
+                    query=request.query,
+                    documents=request_papers,
+                    semantic_scores=request_scores,
+                    citation_map=citation_map,
+                    limit=len(request_papers) if full_ranking else request.limit,
+                    pinned=request_pinned,
+                )
+                for request, request_papers, request_scores, request_pinned in zip(
+                    requests, papers, semantic_scores, pinned, strict=True
+                )
+            ]
+
+    def _finish_trace(self, trace: SearchTrace) -> SearchStats:
+        stats = trace.to_stats()
+        self._metrics.observe_search(stats)
+        return stats
+
+    def _has_more_results(self, entry: SearchCursorEntry, end: int) -> bool:
+        return end < self._cursors.max_results and (end < len(entry.results) or not entry.exhausted)
+
+    def _next_cursor(self, entry_id: str | None, entry: SearchCursorEntry, end: int) -> str | None:
+        if not self._has_more_results(entry, end):
+            return None
+        if entry_id is None:
+            entry_id = self._cursors.create(entry)
+        return self._cursors.encode(entry_id, end)
+
+    def _cursor_candidates(self, results: list[ScoredPaper]) -> list[RankedCandidate]:
+        # with payload hydration the papers came with the candidates, so later pages keep the database off their path
+        return _ranked_candidates(results, keep_papers=self._config.hydration == HydrationSource.payload)
+
+    async def _hydrate_candidates(self, candidates: list[RankedCandidate]) -> list[ScoredPaper]:
+        papers = {x.fully_qualified_name: x.paper for x in candidates if x.paper is not None}
+        papers.update(await self._load_papers([x.fully_qualified_name for x in candidates if x.paper is None]))
+        # papers removed from the database after they were ranked are left out
+        return [
+            ScoredPaper(paper=papers[x.fully_qualified_name], citations=x.citations, score=x.score)
+            for x in candidates
+            if x.fully_qualified_name in papers
+        ]
+
+    async def _extend_cursor(self, entry: SearchCursorEntry, end: int, step: int, trace: SearchTrace) -> None:
+        # grow the Qdrant limit by a page at a time, only candidates that were not ranked yet are hydrated and reranked
+        while len(entry.results) < end and not entry.exhausted:
+            request = entry.request.model_copy(update={"limit": entry.retrieve_limit + step})
+            points = (await self._retrieve_points([request], trace))[0]
+
+            seen = entry.seen
+            new_points = [point for point in points if point.payload["fully_qualified_name"] not in seen]
+            papers = await trace.run_stage(
+                "hydrate", self._hydrate_documents(new_points), self._config.deadlines.hydrate
+            )
+            trace.num_candidates += len(papers)
+            results = await self._rank([request], [new_points], [papers], [set()], trace, full_ranking=True)
+
+            entry.results.extend(self._cursor_candidates(results[0]))
+            entry.retrieve_limit = request.limit
+            # a retrieval that adds nothing (e.g. points missing from the database) will not add anything next time
+            entry.exhausted = not results[0] or len(points) < request.limit * self._config.prefetch_more_times
+
+    async def _search_page(self, request: SearchRequest) -> SearchResponse:
+        trace = SearchTrace()
+
+        entry_id, entry, offset = self._cursors.resolve(request)
+        end = min(offset + request.limit, self._cursors.max_results)
+        async with entry.lock:
+            await self._extend_cursor(entry, end, request.limit, trace)
+
+        # results are only appended to, so the page stays the same once the lock is released
+        results = await trace.run_stage(
+            "hydrate", self._hydrate_candidates(entry.results[offset:end]), self._config.deadlines.hydrate
+        )
+        return SearchResponse(
+            results=results, stats=self._finish_trace(trace), next_cursor=self._next_cursor(entry_id, entry, end)
+        )
 
-        # 4. Fetch Citation Metadata (it may be some external provider)
-        citation_map = await self._fetch_citation_metadata(papers)
+    async def search(self, request: SearchRequest) -> SearchResponse:
+        if request.cursor is not None:
+            return await self._search_page(request)
+
+        trace = SearchTrace()
+
+        points, papers, pinned = await self._retrieve_and_hydrate([request], trace)
+        if not self._cursors.enabled:
+            results = await self._rank([request], points, papers, pinned, trace)
+            return SearchResponse(results=results[0], stats=self._finish_trace(trace))
+
+        # every candidate is reranked anyway, so keep all of them ranked for the following pages
+        results = await self._rank([request], points, papers, pinned, trace, full_ranking=True)
+        entry = SearchCursorEntry(
+            request=request,
+            results=self._cursor_candidates(results[0]),
+            retrieve_limit=request.limit,
+            exhausted=False,
+        )
+        # candidates dropped by pinned title truncation are picked up by the next retrieval
+        entry.exhausted = (
+            len(points[0]) < request.limit * self._config.prefetch_more_times
+            and {point.payload["fully_qualified_name"] for point in points[0]} <= entry.seen
+        )
 
-        # 5. Rerank and Sort (Cross-Encoder + Citation Boost)
-        results = self._apply_ranking_and_sort(
-            query=request.query, documents=papers, citation_map=citation_map, limit=request.limit
+        # the first page is served from the ranked papers at hand, only later pages are hydrated again
+        end = min(request.limit, self._cursors.max_results)
+        return SearchResponse(
+            results=results[0][:end], stats=self._finish_trace(trace), next_cursor=self._next_cursor(None, entry, end)
         )
 
-        end_time = time.perf_counter()
+    async def search_batch(self, requests: list[SearchRequest]) -> BatchSearchResponse:
+        trace = SearchTrace()
+
+        points, papers, pinned = await self._retrieve_and_hydrate(requests, trace)
+        results = await self._rank(requests, points, papers, pinned, trace)
+
+        return BatchSearchResponse(results=results, stats=self._finish_trace(trace))
+
+    async def search_stream(self, request: SearchRequest) -> AsyncGenerator[SearchStreamEvent, None]:
+        trace = SearchTrace()
+
+        points, papers, pinned = await self._retrieve_and_hydrate([request], trace)
+        yield SearchStreamEvent(
+            stage=SearchStreamStage.fused, results=self._fused_results(points[0], papers[0], request.limit)
+        )
 
-        return SearchResponse(results=results, stats=SearchStats(time_taken_seconds=end_time - start_time))
+        results = await self._rank([request], points, papers, pinned, trace)
+        yield SearchStreamEvent(stage=SearchStreamStage.reranked, results=results[0], stats=self._finish_trace(trace))
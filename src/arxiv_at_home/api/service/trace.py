@@ -0,0 +1,44 @@
+import asyncio
+import dataclasses
+import time
+from collections.abc import Awaitable, Generator
+from contextlib import contextmanager
+from typing import TypeVar
+
+from arxiv_at_home.api.dto import SearchStats
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass
+class SearchTrace:
+    start_time: float = dataclasses.field(default_factory=time.perf_counter)
+    stage_seconds: dict[str, float] = dataclasses.field(default_factory=dict)
+    num_candidates: int = 0
+    num_reranked: int = 0
+    query_tokens: int = 0
+    rerank_tokens: int = 0
+
+    @contextmanager
+    def measure(self, stage: str) -> Generator[None, None, None]:
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + time.perf_counter() - stage_start
+
+    async def run_stage(self, stage: str, awaitable: Awaitable[T], deadline_seconds: float | None) -> T:
+        with self.measure(stage):
+            if deadline_seconds is None:
+                return await awaitable
+            return await asyncio.wait_for(awaitable, timeout=deadline_seconds)
+
+    def to_stats(self) -> SearchStats:
+        return SearchStats(
+            time_taken_seconds=time.perf_counter() - self.start_time,
+            stage_seconds=self.stage_seconds,
+            num_candidates=self.num_candidates,
+            num_reranked=self.num_reranked,
+            query_tokens=self.query_tokens,
+            rerank_tokens=self.rerank_tokens,
+        )
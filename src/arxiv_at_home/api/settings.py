@@ -1,8 +1,16 @@
+from enum import StrEnum
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from arxiv_at_home.api.component.citation_provider.factory import AnyCitationProviderConfig
+from arxiv_at_home.api.component.cascade.config import CascadeConfig
+from arxiv_at_home.api.component.paper_cache.config import PaperCacheConfig
+from arxiv_at_home.api.component.query_encoder.config import QueryEncoderConfig
 from arxiv_at_home.api.component.reranker.model import RerankerConfig
+from arxiv_at_home.api.component.search_cursor.config import SearchCursorConfig
+from arxiv_at_home.api.component.sparse_encoder.config import SparseQueryEncoderConfig
+from arxiv_at_home.api.component.warmup.config import WarmupConfig
+from arxiv_at_home.common.citation_provider.factory import AnyCitationProviderConfig
 from arxiv_at_home.common.database.config import DatabaseConfig
 from arxiv_at_home.common.dense.vectorizer import DenseVectorizationConfig
 from arxiv_at_home.common.qdrant.config import QdrantConfig
@@ -11,6 +19,56 @@ from arxiv_at_home.common.qdrant.config import QdrantConfig
 class ServingConfig(BaseModel):
     host: str
     port: int
+    # /ready fails if Qdrant or the database does not answer in time
+    readiness_timeout_seconds: float = 2.0
+
+
+class SearchDeadlinesConfig(BaseModel):
+    # seconds, None disables the deadline
+    embed: float | None = None
+    retrieve: float | None = None
+    hydrate: float | None = None
+    # on timeout, papers are returned with citations=None
+    citations: float | None = 2.0
+    # on timeout, retrieval (fusion) scores are used instead of reranker scores
+    rerank: float | None = None
+
+
+class HydrationSource(StrEnum):
+    database = "database"
+    # requires the collection to be indexed with populator.store_full_metadata, other points fall back to the database
+    payload = "payload"
+
+
+class PinnedTitleRerank(StrEnum):
+    full = "full"
+    # rerank only the first `limit` candidates
+    truncate = "truncate"
+    # keep retrieval (fusion) scores
+    skip = "skip"
+
+
+class TitleLookupConfig(BaseModel):
+    # None enables it unless search.hydration is payload, which otherwise keeps the database off the search path
+    enabled: bool | None = None
+    # shortest titles starting with the normalized query that are compared against title_match_boost_threshold
+    max_candidates: int = 5
+    # shorter normalized queries are prefixes of too many titles to look up
+    min_query_length: int = 4
+    # how to rerank the remaining candidates once a title was pinned
+    rerank: PinnedTitleRerank = PinnedTitleRerank.full
+
+
+class DenseSearchConfig(BaseModel):
+    # HNSW search breadth, Qdrant default when None
+    hnsw_ef: int | None = None
+    # the options below apply only to collections indexed with populator.layout.dense_quantization
+    # candidates are searched with quantized vectors and rescored with the original ones
+    quantization_rescore: bool = True
+    quantization_oversampling: float | None = 2.0
+    ignore_quantization: bool = False
+    # full scan over original vectors, the ground truth for measuring recall of the settings above
+    exact: bool = False
 
 
 class SearchConfig(BaseModel):
@@ -18,6 +76,15 @@ class SearchConfig(BaseModel):
     citation_boost_weight: float
     title_match_boost_threshold: float
     title_match_boost_weight: float
+    deadlines: SearchDeadlinesConfig = SearchDeadlinesConfig()
+    max_batch_requests: int = 256
+    hydration: HydrationSource = HydrationSource.database
+    # papers whose title matches the query by title_match_boost_threshold are returned first
+    title_lookup: TitleLookupConfig = TitleLookupConfig()
+    cursor: SearchCursorConfig = SearchCursorConfig()
+    dense_search: DenseSearchConfig = DenseSearchConfig()
+    # cheap pruning of fused candidates before the LLM reranker
+    cascade: CascadeConfig = CascadeConfig()
 
 
 class ApiSettings(BaseSettings):
@@ -25,8 +92,12 @@ class ApiSettings(BaseSettings):
 
     serving: ServingConfig
     database: DatabaseConfig
+    paper_cache: PaperCacheConfig = PaperCacheConfig()
     qdrant: QdrantConfig
     dense_vectorizer: DenseVectorizationConfig
+    query_encoder: QueryEncoderConfig = QueryEncoderConfig()
+    sparse_query_encoder: SparseQueryEncoderConfig = SparseQueryEncoderConfig()
     reranker: RerankerConfig
     search: SearchConfig
     citation_provider: AnyCitationProviderConfig
+    warmup: WarmupConfig = WarmupConfig()
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import cyclopts
+
+from arxiv_at_home.citations.engine import CitationsEngine
+from arxiv_at_home.citations.settings import CitationsSettings
+
+
+async def main(config_path: Path) -> None:
+    config = CitationsSettings.model_validate_json(config_path.read_text(encoding="utf-8"))
+    engine = CitationsEngine(config)
+    await engine.refresh()
+
+
+if __name__ == "__main__":
+    cyclopts.run(main)
@@ -0,0 +1,109 @@
+import asyncio
+import contextlib
+import datetime as dt
+import time
+
+from tqdm import tqdm
+
+from arxiv_at_home.citations.settings import CitationsSettings
+from arxiv_at_home.common.citation_provider.base import CitationProvider
+from arxiv_at_home.common.citation_provider.factory import create_citation_provider
+from arxiv_at_home.common.database.manager import AsyncDatabaseManager, new_database_manager
+from arxiv_at_home.common.database.repository import CitationCountRepository
+
+
+class CitationsEngine:
+    def __init__(self, config: CitationsSettings) -> None:
+        self._config = config
+
+        self._semaphore = asyncio.Semaphore(config.concurrency)
+        self._rate_limit_lock = asyncio.Lock()
+        self._next_request_at = 0.0
+        self._failed = 0
+
+    async def _wait_for_rate_limit(self) -> None:
+        if self._config.max_requests_per_second is None:
+            return
+
+        async with self._rate_limit_lock:
+            delay = self._next_request_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request_at = time.monotonic() + 1 / self._config.max_requests_per_second
+
+    async def _refresh_batch(
+        self, provider: CitationProvider, db: AsyncDatabaseManager, paper_ids: list[str], pbar: tqdm
+    ) -> None:
+        async with self._semaphore:
+            await self._wait_for_rate_limit()
+            try:
+                counts = await provider.get_citation_count_batch(paper_ids)
+            # failed papers keep their old counts (or stay missing) and are picked up by the next run
+            except Exception:  # noqa: BLE001
+                self._failed += len(paper_ids)
+                pbar.set_postfix(failed=self._failed)
+                pbar.update(len(paper_ids))
+                return
+
+        async with db.session() as session:
+            await CitationCountRepository(session).batch_upload(counts)
+        pbar.update(len(paper_ids))
+
+    async def _refresh_chunk(
+        self, provider: CitationProvider, db: AsyncDatabaseManager, paper_ids: list[str], pbar: tqdm
+    ) -> None:
+        batch_size = self._config.batch_size
+        await asyncio.gather(
+            *(
+                self._refresh_batch(provider, db, paper_ids[i : i + batch_size], pbar)
+                for i in range(0, len(paper_ids), batch_size)
+            )
+        )
+
+    async def _refresh_missing(self, provider: CitationProvider, db: AsyncDatabaseManager, pbar: tqdm) -> None:
+        chunk_size = self._config.batch_size * self._config.concurrency
+        after: str | None = None
+
+        while True:
+            async with db.session() as session:
+                paper_ids = await CitationCountRepository(session).get_missing_ids(after=after, limit=chunk_size)
+            if not paper_ids:
+                return
+
+            await self._refresh_chunk(provider, db, paper_ids, pbar)
+            after = paper_ids[-1]
+
+    async def _refresh_stale(
+        self, provider: CitationProvider, db: AsyncDatabaseManager, fetched_before: dt.datetime, pbar: tqdm
+    ) -> None:
+        chunk_size = self._config.batch_size * self._config.concurrency
+        after: tuple[dt.datetime, str] | None = None
+
+        while True:
+            async with db.session() as session:
+                stale = await CitationCountRepository(session).get_stale_ids(
+                    fetched_before=fetched_before, after=after, limit=chunk_size
+                )
+            if not stale:
+                return
+
+            await self._refresh_chunk(provider, db, [paper_id for paper_id, _ in stale], pbar)
+            # keyset cursor, so papers that failed in this run are not retried in a loop
+            last_id, last_fetched_at = stale[-1]
+            after = (last_fetched_at, last_id)
+
+    async def refresh(self) -> None:
+        # counts stored during this run are newer than this, so an interrupted run resumes where it stopped
+        fetched_before = dt.datetime.now(dt.UTC) - dt.timedelta(seconds=self._config.refresh_older_than_seconds)
+
+        async with (
+            new_database_manager(self._config.database) as db,
+            contextlib.aclosing(create_citation_provider(self._config.citation_provider, db)) as provider,
+        ):
+            async with db.session() as session:
+                estimated_count = await CitationCountRepository(session).estimate_count_for_refresh(fetched_before)
+
+            with tqdm(desc="Citations", total=estimated_count) as pbar:
+                # never fetched papers first, then the oldest counts
+                await self._refresh_missing(provider, db, pbar)
+                await self._refresh_stale(provider, db, fetched_before, pbar)
@@ -0,0 +1,19 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from arxiv_at_home.common.citation_provider.caching import UpstreamCitationProviderConfig
+from arxiv_at_home.common.database.config import DatabaseConfig
+
+
+class CitationsSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_nested_delimiter="__", env_file=".env", extra="ignore")
+
+    database: DatabaseConfig
+    citation_provider: UpstreamCitationProviderConfig
+    # papers per upstream request
+    batch_size: int = 500
+    # upstream requests in flight
+    concurrency: int = 4
+    # None disables rate limiting
+    max_requests_per_second: float | None = 1.0
+    # stored counts fetched earlier than this are refreshed, oldest first
+    refresh_older_than_seconds: float = 7 * 24 * 3600.0
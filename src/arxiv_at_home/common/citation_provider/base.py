@@ -5,3 +5,6 @@ class CitationProvider(abc.ABC):
     @abc.abstractmethod
     async def get_citation_count_batch(self, paper_ids: list[str]) -> dict[str, int | None]:
         pass
+
+    async def aclose(self) -> None:  # noqa: B027
+        pass
@@ -0,0 +1,103 @@
+import asyncio
+import datetime as dt
+import logging
+from collections.abc import Callable, Coroutine
+from typing import Annotated, Any, Literal, TypeVar
+
+from pydantic import BaseModel, Field
+
+from arxiv_at_home.common.citation_provider.base import CitationProvider
+from arxiv_at_home.common.citation_provider.noop import NoOpCitationProviderConfig
+from arxiv_at_home.common.citation_provider.semantic_scholar import SemanticScholarConfig
+from arxiv_at_home.common.database.manager import AsyncDatabaseManager
+from arxiv_at_home.common.database.repository import CitationCountRepository
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+UpstreamCitationProviderConfig = Annotated[
+    SemanticScholarConfig | NoOpCitationProviderConfig, Field(discriminator="type")
+]
+
+
+class CachingCitationProviderConfig(BaseModel):
+    type: Literal["caching"] = "caching"
+
+    upstream: UpstreamCitationProviderConfig
+    # older counts are still served, but refreshed from the upstream provider in the background
+    ttl_seconds: float = 86400.0
+
+
+class CachingCitationProvider(CitationProvider):
+    def __init__(
+        self,
+        config: CachingCitationProviderConfig,
+        upstream: CitationProvider,
+        db_manager: AsyncDatabaseManager,
+        on_refresh_failure: Callable[[], None] | None = None,
+    ) -> None:
+        self._config = config
+        self._upstream = upstream
+        self._db_manager = db_manager
+        self._on_refresh_failure = on_refresh_failure
+
+        self._tasks: set[asyncio.Task] = set()
+        self._refreshing: set[str] = set()
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._upstream.aclose()
+
+    async def _fetch_and_store(self, paper_ids: list[str]) -> dict[str, int | None]:
+        counts = await self._upstream.get_citation_count_batch(paper_ids)
+        async with self._db_manager.session() as sess:
+            await CitationCountRepository(sess).batch_upload(counts)
+        return counts
+
+    async def _refresh(self, paper_ids: list[str]) -> None:
+        try:
+            await self._fetch_and_store(paper_ids)
+        # stale counts stay in place and are retried by a later search
+        except Exception:
+            logger.exception("Refreshing citation counts of %d papers failed", len(paper_ids))
+            if self._on_refresh_failure is not None:
+                self._on_refresh_failure()
+        finally:
+            self._refreshing.difference_update(paper_ids)
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        # nobody may be awaiting a shielded fetch anymore
+        if not task.cancelled():
+            task.exception()
+
+    def _spawn(self, coro: Coroutine[Any, Any, T]) -> asyncio.Task[T]:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    async def get_citation_count_batch(self, paper_ids: list[str]) -> dict[str, int | None]:
+        if not paper_ids:
+            return {}
+
+        async with self._db_manager.session() as sess:
+            cached = await CitationCountRepository(sess).get_by_ids(paper_ids)
+
+        stale_before = dt.datetime.now(dt.UTC) - dt.timedelta(seconds=self._config.ttl_seconds)
+        stale = [x for x, (_, fetched_at) in cached.items() if fetched_at < stale_before and x not in self._refreshing]
+        if stale:
+            self._refreshing.update(stale)
+            self._spawn(self._refresh(stale))
+
+        counts = {x: count for x, (count, _) in cached.items()}
+
+        misses = list(dict.fromkeys(x for x in paper_ids if x not in cached))
+        if misses:
+            # shielded, so the counts are still stored when the search stops waiting for citations
+            counts.update(await asyncio.shield(self._spawn(self._fetch_and_store(misses))))
+
+        return counts
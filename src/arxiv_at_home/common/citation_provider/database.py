@@ -0,0 +1,26 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+from arxiv_at_home.common.citation_provider.base import CitationProvider
+from arxiv_at_home.common.database.manager import AsyncDatabaseManager
+from arxiv_at_home.common.database.repository import CitationCountRepository
+
+
+class DatabaseCitationProviderConfig(BaseModel):
+    # counts filled by `python -m arxiv_at_home.citations`, no external calls are made
+    type: Literal["database"] = "database"
+
+
+class DatabaseCitationProvider(CitationProvider):
+    def __init__(self, db_manager: AsyncDatabaseManager) -> None:
+        self._db_manager = db_manager
+
+    async def get_citation_count_batch(self, paper_ids: list[str]) -> dict[str, int | None]:
+        if not paper_ids:
+            return {}
+
+        async with self._db_manager.session() as sess:
+            stored = await CitationCountRepository(sess).get_by_ids(paper_ids)
+
+        return {x: stored[x][0] if x in stored else None for x in paper_ids}
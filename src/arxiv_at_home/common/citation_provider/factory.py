@@ -0,0 +1,48 @@
+from collections.abc import Callable
+from typing import Annotated
+
+from pydantic import Field
+
+from arxiv_at_home.common.citation_provider.base import CitationProvider
+from arxiv_at_home.common.citation_provider.caching import (
+    CachingCitationProvider,
+    CachingCitationProviderConfig,
+)
+from arxiv_at_home.common.citation_provider.database import (
+    DatabaseCitationProvider,
+    DatabaseCitationProviderConfig,
+)
+from arxiv_at_home.common.citation_provider.noop import NoOpCitationProvider, NoOpCitationProviderConfig
+from arxiv_at_home.common.citation_provider.semantic_scholar import (
+    SemanticScholarConfig,
+    SemanticScholarProvider,
+)
+from arxiv_at_home.common.database.manager import AsyncDatabaseManager
+
+AnyCitationProviderConfig = Annotated[
+    SemanticScholarConfig | NoOpCitationProviderConfig | CachingCitationProviderConfig | DatabaseCitationProviderConfig,
+    Field(discriminator="type"),
+]
+
+
+def create_citation_provider(
+    config: AnyCitationProviderConfig,
+    db_manager: AsyncDatabaseManager,
+    on_refresh_failure: Callable[[], None] | None = None,
+) -> CitationProvider:
+    match config:
+        case CachingCitationProviderConfig():
+            return CachingCitationProvider(
+                config,
+                upstream=create_citation_provider(config.upstream, db_manager),
+                db_manager=db_manager,
+                on_refresh_failure=on_refresh_failure,
+            )
+        case SemanticScholarConfig():
+            return SemanticScholarProvider(config)
+        case DatabaseCitationProviderConfig():
+            return DatabaseCitationProvider(db_manager)
+        case NoOpCitationProviderConfig():
+            return NoOpCitationProvider()
+        case _:
+            raise ValueError("Unknown citation provider")
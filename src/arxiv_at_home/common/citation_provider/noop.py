@@ -2,7 +2,7 @@ from typing import Literal
 
 from pydantic import BaseModel
 
-from arxiv_at_home.api.component.citation_provider.base import CitationProvider
+from arxiv_at_home.common.citation_provider.base import CitationProvider
 
 
 class NoOpCitationProviderConfig(BaseModel):
@@ -6,7 +6,7 @@ import httpx
 from httpx import AsyncClient
 from pydantic import BaseModel
 
-from arxiv_at_home.api.component.citation_provider.base import CitationProvider
+from arxiv_at_home.common.citation_provider.base import CitationProvider
 
 
 class SemanticScholarConfig(BaseModel):
@@ -27,6 +27,9 @@ class SemanticScholarProvider(CitationProvider):
         )
         self._config = config
 
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
     @staticmethod
     def _normalize_id(paper_id: str) -> str:
         paper_source, paper_id = paper_id.split("/", maxsplit=1)
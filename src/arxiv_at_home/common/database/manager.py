@@ -1,14 +1,32 @@
+import dataclasses
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from arxiv_at_home.common.database.config import DatabaseConfig
 
 
+@dataclasses.dataclass
+class DatabasePoolStatus:
+    size: int
+    checked_out: int
+    overflow: int
+
+
 class AsyncDatabaseManager:
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], engine: AsyncEngine) -> None:
         self._session_factory = session_factory
+        self._engine = engine
+
+    def pool_status(self) -> DatabasePoolStatus:
+        pool = self._engine.pool
+        return DatabasePoolStatus(size=pool.size(), checked_out=pool.checkedout(), overflow=max(pool.overflow(), 0))
+
+    async def ping(self) -> None:
+        async with self._engine.connect() as conn:
+            await conn.execute(sa.text("SELECT 1"))
 
     @asynccontextmanager
     async def session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -35,6 +53,6 @@ async def new_database_manager(config: DatabaseConfig) -> AsyncGenerator[AsyncDa
 
     session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
 
-    yield AsyncDatabaseManager(session_factory=session_factory)
+    yield AsyncDatabaseManager(session_factory=session_factory, engine=engine)
 
     await engine.dispose()
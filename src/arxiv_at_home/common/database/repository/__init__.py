@@ -1,5 +1,6 @@
 from .base import ArxivDeclarativeBase
+from .citation import CitationCountRepository
 from .metadata import PaperMetadataRepository
 from .sync_state import SyncStateRepository
 
-__all__ = ["ArxivDeclarativeBase", "PaperMetadataRepository", "SyncStateRepository"]
+__all__ = ["ArxivDeclarativeBase", "CitationCountRepository", "PaperMetadataRepository", "SyncStateRepository"]
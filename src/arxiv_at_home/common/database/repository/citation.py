@@ -0,0 +1,109 @@
+import datetime as dt
+
+import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql as sapg
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from arxiv_at_home.common.database.repository.base import ArxivDeclarativeBase
+from arxiv_at_home.common.database.repository.metadata import PaperMetadataStored
+
+
+class CitationCountStored(ArxivDeclarativeBase):
+    __tablename__ = "citation_counts"
+
+    fully_qualified_name: Mapped[str] = mapped_column(sa.String(255), primary_key=True)
+    # None if the citation provider does not know the paper
+    citation_count: Mapped[int | None] = mapped_column(sa.Integer, nullable=True)
+
+    fetched_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True))
+
+    # Index for the offline refresh: oldest counts first
+    __table_args__ = (sa.Index("idx_citation_counts_fetched_at", "fetched_at", "fully_qualified_name"),)
+
+
+class CitationCountRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get_by_ids(self, fully_qualified_names: list[str]) -> dict[str, tuple[int | None, dt.datetime]]:
+        if not fully_qualified_names:
+            return {}
+
+        stmt = sa.select(CitationCountStored).where(CitationCountStored.fully_qualified_name.in_(fully_qualified_names))
+
+        result = await self._session.execute(stmt)
+        return {x.fully_qualified_name: (x.citation_count, x.fetched_at) for x in result.scalars().all()}
+
+    async def batch_upload(self, citation_counts: dict[str, int | None]) -> int:
+        if not citation_counts:
+            return 0
+
+        now = dt.datetime.now(dt.UTC)
+
+        stmt = sapg.insert(CitationCountStored).values(
+            [
+                {"fully_qualified_name": fqn, "citation_count": count, "fetched_at": now}
+                for fqn, count in citation_counts.items()
+            ]
+        )
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CitationCountStored.fully_qualified_name],
+            set_={"citation_count": stmt.excluded.citation_count, "fetched_at": stmt.excluded.fetched_at},
+        )
+
+        result = await self._session.execute(stmt)
+
+        return result.rowcount
+
+    async def get_missing_ids(self, after: str | None, limit: int) -> list[str]:
+        # papers that were never looked up, in primary key order
+        stmt = (
+            sa.select(PaperMetadataStored.fully_qualified_name)
+            .where(
+                ~sa.exists().where(CitationCountStored.fully_qualified_name == PaperMetadataStored.fully_qualified_name)
+            )
+            .order_by(PaperMetadataStored.fully_qualified_name)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(PaperMetadataStored.fully_qualified_name > after)
+
+        result = await self._session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_stale_ids(
+        self, fetched_before: dt.datetime, after: tuple[dt.datetime, str] | None, limit: int
+    ) -> list[tuple[str, dt.datetime]]:
+        stmt = (
+            sa.select(CitationCountStored.fully_qualified_name, CitationCountStored.fetched_at)
+            .where(CitationCountStored.fetched_at < fetched_before)
+            .order_by(CitationCountStored.fetched_at, CitationCountStored.fully_qualified_name)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(
+                sa.tuple_(CitationCountStored.fetched_at, CitationCountStored.fully_qualified_name)
+                > sa.tuple_(sa.literal(after[0], sa.DateTime(timezone=True)), sa.literal(after[1], sa.String(255)))
+            )
+
+        result = await self._session.execute(stmt)
+        return [(fqn, fetched_at) for fqn, fetched_at in result.all()]
+
+    async def estimate_count_for_refresh(self, fetched_before: dt.datetime) -> int:
+        missing = (
+            sa.select(sa.func.count())
+            .select_from(PaperMetadataStored)
+            .where(
+                ~sa.exists().where(CitationCountStored.fully_qualified_name == PaperMetadataStored.fully_qualified_name)
+            )
+        )
+        stale = (
+            sa.select(sa.func.count())
+            .select_from(CitationCountStored)
+            .where(CitationCountStored.fetched_at < fetched_before)
+        )
+
+        result = await self._session.execute(sa.select(missing.scalar_subquery() + stale.scalar_subquery()))
+        return result.scalar_one()
@@ -16,6 +16,8 @@ class PaperMetadataStored(ArxivDeclarativeBase):
     fully_qualified_name: Mapped[str] = mapped_column(sa.String(255), primary_key=True)
     paper_metadata: Mapped[dict] = mapped_column(sapg.JSONB)
     abstract_len: Mapped[int] = mapped_column(sa.Integer)
+    # PaperMetadata.normalized_title, for the title lookup
+    normalized_title: Mapped[str | None] = mapped_column(sa.Text, nullable=True)
 
     synced_at: Mapped[dt.datetime] = mapped_column(sa.DateTime(timezone=True))
 
@@ -28,6 +30,10 @@ class PaperMetadataStored(ArxivDeclarativeBase):
         sa.Index(
             "idx_papers_queue", "abstract_len", postgresql_where=(indexed_at.is_(None) & indexing_reserved_at.is_(None))
         ),
+        # Equality and prefix (LIKE 'abc%') lookups of normalized titles
+        sa.Index(
+            "idx_papers_normalized_title", "normalized_title", postgresql_ops={"normalized_title": "text_pattern_ops"}
+        ),
     )
 
 
@@ -49,6 +55,7 @@ class PaperMetadataRepository:
                     "synced_at": now,
                     "paper_metadata": p.model_dump(mode="json"),
                     "abstract_len": len(p.abstract),
+                    "normalized_title": p.normalized_title,
                 }
             )
 
@@ -60,6 +67,7 @@ class PaperMetadataRepository:
                 "synced_at": stmt.excluded.synced_at,
                 "paper_metadata": stmt.excluded.paper_metadata,
                 "abstract_len": stmt.excluded.abstract_len,
+                "normalized_title": stmt.excluded.normalized_title,
                 "indexed_at": None,
                 "indexing_reserved_at": None,
             },
@@ -132,6 +140,11 @@ class PaperMetadataRepository:
         return result.scalar_one()
 
     async def get_by_ids(self, fully_qualified_names: list[str]) -> list[PaperMetadata]:
+        return [paper for paper, _ in await self.get_by_ids_with_sync_time(fully_qualified_names)]
+
+    async def get_by_ids_with_sync_time(
+        self, fully_qualified_names: list[str]
+    ) -> list[tuple[PaperMetadata, dt.datetime]]:
         if not fully_qualified_names:
             return []
 
@@ -147,6 +160,60 @@ class PaperMetadataRepository:
         for fqn in fully_qualified_names:
             if fqn in paper_map:
                 obj = paper_map[fqn]
-                ordered_papers.append(PaperMetadata.model_validate(obj.paper_metadata))
+                ordered_papers.append((PaperMetadata.model_validate(obj.paper_metadata), obj.synced_at))
 
         return ordered_papers
+
+    async def get_sync_times(self, fully_qualified_names: list[str]) -> dict[str, dt.datetime]:
+        if not fully_qualified_names:
+            return {}
+
+        stmt = sa.select(PaperMetadataStored.fully_qualified_name, PaperMetadataStored.synced_at).where(
+            PaperMetadataStored.fully_qualified_name.in_(fully_qualified_names)
+        )
+
+        result = await self._session.execute(stmt)
+        return {fqn: synced_at for fqn, synced_at in result.all()}
+
+    async def find_by_title_prefixes(
+        self, queries: list[tuple[str, str]], limit: int, max_length_factor: float | None = None
+    ) -> list[list[PaperMetadata]]:
+        # (source, normalized title) pairs, answered by one statement
+        unique = list(dict.fromkeys(query for query in queries if query[1]))
+        if not unique:
+            return [[] for _ in queries]
+
+        # one prefix scan over idx_papers_normalized_title per distinct query;
+        # only papers that are already searchable, shortest titles first, so an exact match comes first
+        selects = []
+        for i, (source, normalized_title) in enumerate(unique):
+            select = (
+                sa.select(sa.literal(i).label("query_idx"), PaperMetadataStored.paper_metadata)
+                # normalized titles contain no LIKE wildcards
+                .where(PaperMetadataStored.normalized_title.like(f"{normalized_title}%"))
+                .where(PaperMetadataStored.fully_qualified_name.startswith(f"{source}/", autoescape=True))
+                .where(PaperMetadataStored.indexed_at.is_not(None))
+                .order_by(
+                    sa.func.length(PaperMetadataStored.normalized_title), PaperMetadataStored.fully_qualified_name
+                )
+                .limit(limit)
+            )
+            if max_length_factor is not None:
+                # longer titles are left out up front, so a short prefix does not collect and sort every match;
+                # the epsilon keeps float error from dropping a title of exactly the bound
+                max_length = int(len(normalized_title) * max_length_factor + 1e-9)
+                select = select.where(sa.func.length(PaperMetadataStored.normalized_title) <= max_length)
+            selects.append(select)
+        stmt = sa.union_all(*selects)
+
+        result = await self._session.execute(stmt)
+        found: dict[int, list[PaperMetadata]] = {}
+        for query_idx, paper_metadata in result.all():
+            found.setdefault(query_idx, []).append(PaperMetadata.model_validate(paper_metadata))
+
+        # UNION ALL does not guarantee the order of the branches' rows
+        by_query = {
+            query: sorted(found.get(i, []), key=lambda x: (len(x.normalized_title), x.fully_qualified_name))
+            for i, query in enumerate(unique)
+        }
+        return [by_query.get(query, []) for query in queries]
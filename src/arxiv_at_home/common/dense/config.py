@@ -2,6 +2,8 @@ from enum import StrEnum
 
 from pydantic import BaseModel
 
+from arxiv_at_home.common.inference.config import InferenceBackendConfig
+
 
 class PoolingMode(StrEnum):
     last_token = "last_token"  # noqa: S105
@@ -14,3 +16,6 @@ class DenseVectorizationConfig(BaseModel):
     pooling: PoolingMode
     query_template: str
     document_template: str
+    # Matryoshka truncation of the embedding (the model has to be trained for it), the full hidden size when None
+    output_dim: int | None = None
+    backend: InferenceBackendConfig = InferenceBackendConfig()
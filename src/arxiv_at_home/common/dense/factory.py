@@ -1,18 +1,56 @@
 from collections.abc import Generator
 from contextlib import contextmanager
 
+import torch
 from tokenizers import Tokenizer
 from transformers import AutoModel, AutoTokenizer
 
 from arxiv_at_home.common.dense.config import DenseVectorizationConfig
 from arxiv_at_home.common.dense.template import DenseEncodingTemplate
-from arxiv_at_home.common.dense.vectorizer import DenseVectorizer
+from arxiv_at_home.common.dense.vectorizer import DenseVectorizer, VectorizerInputs
+from arxiv_at_home.common.inference.backend import (
+    apply_inference_backend,
+    check_parity,
+    configure_threads,
+    resolve_dtype,
+)
+from arxiv_at_home.common.inference.collate import collate_right_padded
+from arxiv_at_home.common.inference.config import InferenceBackendType
+
+_PARITY_PROBES = [
+    "attention is all you need",
+    "graph neural networks for molecular property prediction",
+]
+
+
+def _parity_inputs(config: DenseVectorizationConfig) -> VectorizerInputs:
+    template = create_dense_template(config)
+    encodings = create_dense_tokenizer(config).encode_batch([template.template_query(x) for x in _PARITY_PROBES])
+    return collate_right_padded([x.ids for x in encodings])
 
 
 @contextmanager
 def create_dense_vectorizer(config: DenseVectorizationConfig) -> Generator[DenseVectorizer, None, None]:
-    model = AutoModel.from_pretrained(config.model, attn_implementation="sdpa").eval().to(config.device)
-    yield DenseVectorizer(config, model)
+    backend = config.backend
+    configure_threads(backend)
+    model = (
+        AutoModel.from_pretrained(config.model, dtype=resolve_dtype(backend, default=None), attn_implementation="sdpa")
+        .eval()
+        .to(config.device)
+    )
+
+    vectorizer = DenseVectorizer(config, apply_inference_backend(backend, model, config.device))
+    if backend.type != InferenceBackendType.eager and backend.parity_tolerance is not None:
+        inputs = _parity_inputs(config)
+        embeddings = torch.stack(vectorizer(inputs))
+        reference = torch.stack(DenseVectorizer(config, model)(inputs))
+        # embeddings are normalized, so this is the cosine distance
+        check_parity(backend, "Dense vectorizer", (1 - (embeddings * reference).sum(dim=1)).max().item())
+
+    # the eager model stays alive only if the backend wraps it
+    del model
+
+    yield vectorizer
 
 
 def create_dense_tokenizer(config: DenseVectorizationConfig) -> Tokenizer:
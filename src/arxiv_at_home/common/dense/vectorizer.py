@@ -27,6 +27,10 @@ def pool_tokens(last_hidden_states: torch.Tensor, attention_mask: torch.Tensor,
 
 class DenseVectorizer:
     def __init__(self, config: DenseVectorizationConfig, model: AutoModel) -> None:
+        hidden_size = model.config.hidden_size
+        if config.output_dim is not None and not 0 < config.output_dim <= hidden_size:
+            raise ValueError(f"output_dim should be in (0, {hidden_size}], got {config.output_dim}")
+
         self._config = config
         self._device = torch.device(config.device)
         self._model = model
@@ -39,6 +43,8 @@ class DenseVectorizer:
         last_hidden_state = self._model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
 
         pooled = pool_tokens(last_hidden_state, attention_mask, self._config.pooling)
+        if self._config.output_dim is not None:
+            pooled = pooled[:, : self._config.output_dim]
 
         embeddings = F.normalize(pooled, p=2, dim=1)
 
@@ -1,7 +1,14 @@
 import datetime as dt
+import re
 
 from pydantic import BaseModel
 
+_RE_NOT_WORD = re.compile(r"[^A-Za-z0-9]")
+
+
+def normalize_title(text: str) -> str:
+    return " ".join(_RE_NOT_WORD.sub(" ", text.lower()).split())
+
 
 class PaperMetadataVersion(BaseModel):
     version: str
@@ -25,3 +32,7 @@ class PaperMetadata(BaseModel):
     @property
     def fully_qualified_name(self) -> str:
         return f"{self.source}/{self.id}"
+
+    @property
+    def normalized_title(self) -> str:
+        return normalize_title(self.title)
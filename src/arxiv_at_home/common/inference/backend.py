@@ -0,0 +1,82 @@
+from typing import cast
+
+import numpy as np
+import torch
+from torch import nn
+from torch.ao.quantization import quantize_dynamic
+from transformers.modeling_outputs import BaseModelOutput
+
+from arxiv_at_home.common.inference.config import InferenceBackendConfig, InferenceBackendType, ModelDtype
+
+_FLOAT32_BACKENDS = {InferenceBackendType.int8_dynamic, InferenceBackendType.onnx}
+_CPU_BACKENDS = {InferenceBackendType.int8_dynamic, InferenceBackendType.onnx}
+
+
+class OnnxEncoder(nn.Module):
+    # stands in for a transformers base model: called with input_ids/attention_mask, returns last_hidden_state
+    def __init__(self, config: InferenceBackendConfig, onnx_path: str, model_config: object) -> None:
+        super().__init__()
+
+        # only installed through fastembed-gpu (as onnxruntime-gpu), so it is not required by the other backends
+        import onnxruntime as ort  # noqa: PLC0415
+
+        options = ort.SessionOptions()
+        if config.intra_op_threads is not None:
+            options.intra_op_num_threads = config.intra_op_threads
+        self._session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {x.name for x in self._session.get_inputs()}
+        self.config = model_config
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor, **kwargs: object) -> BaseModelOutput:
+        inputs = {"input_ids": input_ids.cpu().numpy(), "attention_mask": attention_mask.cpu().numpy()}
+        if "position_ids" in self._input_names:
+            # right padding, so positions simply count non-padding tokens
+            inputs["position_ids"] = np.clip(inputs["attention_mask"].cumsum(axis=1) - 1, 0, None)
+
+        last_hidden_state = self._session.run(None, {k: v for k, v in inputs.items() if k in self._input_names})[0]
+        return BaseModelOutput(
+            last_hidden_state=cast(torch.FloatTensor, torch.from_numpy(last_hidden_state).to(input_ids.device))
+        )
+
+
+def resolve_dtype(config: InferenceBackendConfig, default: torch.dtype | None) -> torch.dtype | None:
+    if config.type in _FLOAT32_BACKENDS:
+        if config.dtype not in {None, ModelDtype.float32}:
+            raise ValueError(f"The {config.type} backend runs in float32, got dtype {config.dtype}")
+        return torch.float32
+    if config.dtype is not None:
+        return getattr(torch, config.dtype)
+    return default
+
+
+def configure_threads(config: InferenceBackendConfig) -> None:
+    # process-wide, so models that share a process should agree on it
+    if config.intra_op_threads is not None:
+        torch.set_num_threads(config.intra_op_threads)
+
+
+def apply_inference_backend(config: InferenceBackendConfig, module: nn.Module, device: str) -> nn.Module:
+    if config.type in _CPU_BACKENDS and torch.device(device).type != "cpu":
+        raise ValueError(f"The {config.type} backend runs on CPU, got device {device}")
+
+    match config.type:
+        case InferenceBackendType.eager:
+            return module
+        case InferenceBackendType.compile:
+            # sequence lengths and batch sizes vary with every batch
+            return cast(nn.Module, torch.compile(module, dynamic=True))
+        case InferenceBackendType.int8_dynamic:
+            return quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+        case InferenceBackendType.onnx:
+            # InferenceBackendConfig rejects the onnx backend without onnx_path
+            return OnnxEncoder(config, onnx_path=cast(str, config.onnx_path), model_config=module.config)
+        case _:
+            raise ValueError(f"Unknown inference backend: {config.type}")
+
+
+def check_parity(config: InferenceBackendConfig, name: str, max_diff: float) -> None:
+    if config.parity_tolerance is not None and max_diff > config.parity_tolerance:
+        raise ValueError(
+            f"{name} outputs of the {config.type} backend differ from the eager model by {max_diff:.4f}, "
+            f"consider another backend or a larger 'parity_tolerance'"
+        )
@@ -0,0 +1,25 @@
+from typing import TypedDict
+
+import torch
+from d9d.dataset import PaddingSide1D, pad_stack_1d
+
+
+class TokenInputs(TypedDict):
+    input_ids: torch.Tensor
+    attention_mask: torch.Tensor
+
+
+def collate_right_padded(token_ids: list[list[int]], device: str | torch.device | None = None) -> TokenInputs:
+    # last token pooling and prefix cache scoring both pick the last non-padding position, so padding goes right
+    return {
+        "input_ids": pad_stack_1d(
+            [torch.tensor(x, dtype=torch.long, device=device) for x in token_ids],
+            pad_value=0,
+            padding_side=PaddingSide1D.right,
+        ),
+        "attention_mask": pad_stack_1d(
+            [torch.ones(len(x), dtype=torch.long, device=device) for x in token_ids],
+            pad_value=0,
+            padding_side=PaddingSide1D.right,
+        ),
+    }
@@ -0,0 +1,37 @@
+from enum import StrEnum
+from typing import Self
+
+from pydantic import BaseModel, model_validator
+
+
+class InferenceBackendType(StrEnum):
+    eager = "eager"
+    compile = "compile"
+    # int8 weights for linear layers, activations are quantized on the fly; CPU only
+    int8_dynamic = "int8_dynamic"
+    # ONNX Runtime session over a model exported beforehand (e.g. `optimum-cli export onnx --task feature-extraction`)
+    onnx = "onnx"
+
+
+class ModelDtype(StrEnum):
+    float32 = "float32"
+    float16 = "float16"
+    bfloat16 = "bfloat16"
+
+
+class InferenceBackendConfig(BaseModel):
+    type: InferenceBackendType = InferenceBackendType.eager
+    # the model default when None; int8_dynamic and onnx run in float32
+    dtype: ModelDtype | None = None
+    # torch (and ONNX Runtime) intra-op threads, library default when None
+    intra_op_threads: int | None = None
+    # path to model.onnx of the base (headless) model, required by the onnx backend
+    onnx_path: str | None = None
+    # outputs of the backend are compared with the eager model on startup, None skips the check
+    parity_tolerance: float | None = 1e-2
+
+    @model_validator(mode="after")
+    def check_onnx_path(self) -> Self:
+        if self.type == InferenceBackendType.onnx and self.onnx_path is None:
+            raise ValueError("The onnx backend requires 'onnx_path'")
+        return self
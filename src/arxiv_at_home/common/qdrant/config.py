@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 
 QDRANT_SPARSE_MODEL = "Qdrant/bm25"
+# payload key of the full PaperMetadata, present only for collections indexed with store_full_metadata
+QDRANT_PAPER_METADATA_PAYLOAD = "paper_metadata"
 
 
 class QdrantConfig(BaseModel):
@@ -1,34 +1,154 @@
 import uuid
+from enum import StrEnum
 from typing import Any
 
 import torch
+from pydantic import BaseModel
 from qdrant_client import AsyncQdrantClient
-from qdrant_client.http.models import Distance, Document, Modifier, SparseIndexParams, SparseVectorParams, VectorParams
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Disabled,
+    Distance,
+    Document,
+    HnswConfigDiff,
+    Modifier,
+    PayloadSchemaType,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SparseIndexParams,
+    SparseVectorParams,
+    VectorParams,
+    VectorParamsDiff,
+)
 
 from arxiv_at_home.common.dto import PaperMetadata
-from arxiv_at_home.common.qdrant.config import QDRANT_SPARSE_MODEL
+from arxiv_at_home.common.qdrant.config import QDRANT_PAPER_METADATA_PAYLOAD, QDRANT_SPARSE_MODEL
 from arxiv_at_home.index.component.batch_type import PaperMetadataDatasetSparseBatch
 
+_PAYLOAD_INDEXES = {
+    "categories": PayloadSchemaType.KEYWORD,
+    "updated_at": PayloadSchemaType.DATETIME,
+}
+
 
 def metadata_to_uuid(metadata: PaperMetadata) -> uuid.UUID:
     return uuid.uuid5(uuid.NAMESPACE_DNS, metadata.fully_qualified_name)
 
 
+class DenseQuantization(StrEnum):
+    none = "none"
+    # int8, 4x smaller than float32
+    scalar = "scalar"
+    # 1 bit per dimension, 32x smaller; needs oversampling and rescoring at query time
+    binary = "binary"
+
+
+class CollectionLayoutConfig(BaseModel):
+    dense_quantization: DenseQuantization = DenseQuantization.none
+    # keep quantized vectors in RAM when the original ones are on disk
+    quantization_always_ram: bool = True
+    scalar_quantile: float = 0.99
+    # original vectors are memory mapped and only read for rescoring
+    dense_on_disk: bool = False
+    payload_on_disk: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    hnsw_on_disk: bool = False
+    # apply the layout to collections created with a different one, Qdrant rebuilds their segments in the background
+    update_existing: bool = False
+
+
+class CollectionPopulatorConfig(BaseModel):
+    # store the whole paper in the payload, so the API can hydrate search results without the database
+    store_full_metadata: bool = False
+    layout: CollectionLayoutConfig = CollectionLayoutConfig()
+
+
 class CollectionPopulator:
-    def __init__(self, client: AsyncQdrantClient) -> None:
+    def __init__(self, client: AsyncQdrantClient, config: CollectionPopulatorConfig) -> None:
         self._client = client
+        self._config = config
+        self._ensured_collections: set[str] = set()
+
+    def _dense_quantization(self) -> ScalarQuantization | BinaryQuantization | None:
+        layout = self._config.layout
+        match layout.dense_quantization:
+            case DenseQuantization.scalar:
+                return ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8, quantile=layout.scalar_quantile, always_ram=layout.quantization_always_ram
+                    )
+                )
+            case DenseQuantization.binary:
+                return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=layout.quantization_always_ram))
+            case DenseQuantization.none:
+                return None
+            case _:
+                raise ValueError(f"Unknown quantization: {layout.dense_quantization}")
+
+    def _dense_hnsw(self) -> HnswConfigDiff:
+        layout = self._config.layout
+        return HnswConfigDiff(m=layout.hnsw_m, ef_construct=layout.hnsw_ef_construct, on_disk=layout.hnsw_on_disk)
+
+    async def _check_dense_dim(self, source: str, dense_dim: int) -> None:
+        collection = await self._client.get_collection(source)
+        collection_dim = collection.config.params.vectors["metadata/dense"].size
+        if collection_dim != dense_dim:
+            raise ValueError(
+                f"Collection '{source}' stores {collection_dim}-dim dense vectors, got {dense_dim} "
+                "(was dense_vectorizer.output_dim changed?)"
+            )
 
     async def _ensure_collection(self, source: str, dense_dim: int) -> None:
-        if not await self._client.collection_exists(source):
+        if source in self._ensured_collections:
+            return
+
+        layout = self._config.layout
+        collection_exists = await self._client.collection_exists(source)
+        if collection_exists:
+            await self._check_dense_dim(source, dense_dim)
+
+        if not collection_exists:
             await self._client.create_collection(
                 collection_name=source,
                 sparse_vectors_config={
                     "title/sparse": SparseVectorParams(index=SparseIndexParams(), modifier=Modifier.IDF),
                     "abstract/sparse": SparseVectorParams(index=SparseIndexParams(), modifier=Modifier.IDF),
                 },
-                vectors_config={"metadata/dense": VectorParams(size=dense_dim, distance=Distance.COSINE)},
+                vectors_config={
+                    "metadata/dense": VectorParams(
+                        size=dense_dim,
+                        distance=Distance.COSINE,
+                        on_disk=layout.dense_on_disk,
+                        hnsw_config=self._dense_hnsw(),
+                        quantization_config=self._dense_quantization(),
+                    )
+                },
+                on_disk_payload=layout.payload_on_disk,
+            )
+        elif layout.update_existing:
+            # payload storage can not be moved after creation
+            await self._client.update_collection(
+                collection_name=source,
+                vectors_config={
+                    "metadata/dense": VectorParamsDiff(
+                        on_disk=layout.dense_on_disk,
+                        hnsw_config=self._dense_hnsw(),
+                        quantization_config=self._dense_quantization() or Disabled.DISABLED,
+                    )
+                },
+            )
+
+        # payload indexes for search filters, also added to collections created before them
+        for field_name, field_schema in _PAYLOAD_INDEXES.items():
+            await self._client.create_payload_index(
+                collection_name=source, field_name=field_name, field_schema=field_schema
             )
 
+        self._ensured_collections.add(source)
+
     def _vectors_from_meta(self, sparse_title: str, sparse_abstract: str, dense_vector: torch.Tensor) -> dict[str, Any]:
         return {
             "title/sparse": Document(text=sparse_title, model=QDRANT_SPARSE_MODEL),
@@ -37,7 +157,7 @@ class CollectionPopulator:
         }
 
     def _payload_from_meta(self, meta: PaperMetadata) -> dict[str, Any]:
-        return {
+        payload = {
             "title": meta.title,  # for debugging purposes only
             "n_versions": len(meta.versions),
             "journal_ref": meta.journal_ref,
@@ -45,6 +165,9 @@ class CollectionPopulator:
             "updated_at": meta.updated_at,
             "categories": list(meta.categories),
         }
+        if self._config.store_full_metadata:
+            payload[QDRANT_PAPER_METADATA_PAYLOAD] = meta.model_dump(mode="json")
+        return payload
 
     async def upsert_metadata(
         self,
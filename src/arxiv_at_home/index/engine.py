@@ -39,7 +39,7 @@ class IndexEngine:
 
     async def index(self) -> None:
         tokenizer = create_dense_tokenizer(self._config.dense_vectorizer)
-        populator = CollectionPopulator(create_qdrant(self._config.qdrant))
+        populator = CollectionPopulator(create_qdrant(self._config.qdrant), config=self._config.populator)
         with create_dense_vectorizer(self._config.dense_vectorizer) as vectorizer:
             async with new_database_manager(self._config.database) as db_manager:
                 async with db_manager.session() as sess:
@@ -4,6 +4,7 @@ from arxiv_at_home.common.database.config import DatabaseConfig
 from arxiv_at_home.common.dense.vectorizer import DenseVectorizationConfig
 from arxiv_at_home.common.qdrant.config import QdrantConfig
 from arxiv_at_home.index.component.dataset import PaperMetadataDatasetConfig
+from arxiv_at_home.index.component.populator import CollectionPopulatorConfig
 
 
 class IndexSettings(BaseSettings):
@@ -13,3 +14,4 @@ class IndexSettings(BaseSettings):
     qdrant: QdrantConfig
     dataset: PaperMetadataDatasetConfig
     dense_vectorizer: DenseVectorizationConfig
+    populator: CollectionPopulatorConfig = CollectionPopulatorConfig()
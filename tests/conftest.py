@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+import torch
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+from transformers import PreTrainedTokenizerFast, Qwen3Config, Qwen3ForCausalLM
+
+# every word of the test texts, anything else is encoded as [UNK]
+_CORPUS = """
+judge whether the document meets the query <Query>: <Document>: answer: yes no instruct:
+attention is all you need graph neural networks for molecules molecular property prediction
+a survey on large language models code generation and
+"""
+
+
+@pytest.fixture(scope="session")
+def tiny_tokenizer() -> Tokenizer:
+    words = sorted({word for word, _ in Whitespace().pre_tokenize_str(_CORPUS)})
+    tokenizer = Tokenizer(WordLevel({word: i for i, word in enumerate(["[PAD]", "[UNK]", *words])}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    return tokenizer
+
+
+@pytest.fixture(scope="session")
+def tiny_model(tiny_tokenizer: Tokenizer) -> Qwen3ForCausalLM:
+    # random weights, small enough to run every backend on CPU in a few seconds
+    torch.manual_seed(0)
+    config = Qwen3Config(
+        vocab_size=tiny_tokenizer.get_vocab_size(),
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        head_dim=16,
+    )
+    return Qwen3ForCausalLM(config).eval()
+
+
+@pytest.fixture(scope="session")
+def tiny_model_path(
+    tmp_path_factory: pytest.TempPathFactory, tiny_model: Qwen3ForCausalLM, tiny_tokenizer: Tokenizer
+) -> Path:
+    path = tmp_path_factory.mktemp("tiny-qwen3")
+    tiny_model.save_pretrained(path)
+    PreTrainedTokenizerFast(tokenizer_object=tiny_tokenizer, unk_token="[UNK]", pad_token="[PAD]").save_pretrained(path)
+    return path
@@ -0,0 +1,153 @@
+import asyncio
+import datetime as dt
+import functools
+import itertools
+import json
+import time
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Self
+
+import httpx
+import pytest
+
+from arxiv_at_home.citations import engine
+from arxiv_at_home.citations.engine import CitationsEngine
+from arxiv_at_home.citations.settings import CitationsSettings
+from arxiv_at_home.common.citation_provider import semantic_scholar
+from arxiv_at_home.common.database.config import DatabaseConfig
+
+_BATCH_SIZE = 3
+_CONCURRENCY = 2
+_MAX_REQUESTS_PER_SECOND = 20.0
+_REFRESH_OLDER_THAN_SECONDS = 3600.0
+
+_NOW = dt.datetime.now(dt.UTC)
+_LONG_AGO = _NOW - dt.timedelta(days=30)
+
+
+class _FakeSemanticScholar:
+    # stands in for POST /graph/v1/paper/batch, answered through httpx.MockTransport
+    def __init__(self, unknown: set[str], malformed: set[str]) -> None:
+        self._unknown = unknown
+        self._malformed = malformed
+        self.requests: list[tuple[float, list[str]]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        s2_ids = json.loads(request.content)["ids"]
+        self.requests.append((time.monotonic(), s2_ids))
+
+        papers = [None if x in self._unknown else {"paperId": x, "citationCount": len(x)} for x in s2_ids]
+        if self._malformed.intersection(s2_ids):
+            # one paper short, the provider cannot tell which one is missing
+            papers = papers[:-1]
+        return httpx.Response(200, json=papers)
+
+
+class _FakeCitationStore:
+    # in-memory paper_records and citation_counts, queried the way CitationCountRepository queries them
+    def __init__(self, papers: list[str], counts: dict[str, tuple[int | None, dt.datetime]]) -> None:
+        self.papers = sorted(papers)
+        self.counts = dict(counts)
+        self.missing_after: list[str | None] = []
+        self.stale_after: list[tuple[dt.datetime, str] | None] = []
+
+
+class _FakeCitationCountRepository:
+    def __init__(self, session: _FakeCitationStore) -> None:
+        self._store = session
+
+    async def batch_upload(self, citation_counts: dict[str, int | None]) -> int:
+        now = dt.datetime.now(dt.UTC)
+        self._store.counts.update((fqn, (count, now)) for fqn, count in citation_counts.items())
+        return len(citation_counts)
+
+    async def get_missing_ids(self, after: str | None, limit: int) -> list[str]:
+        self._store.missing_after.append(after)
+        missing = [x for x in self._store.papers if x not in self._store.counts]
+        return [x for x in missing if after is None or x > after][:limit]
+
+    async def get_stale_ids(
+        self, fetched_before: dt.datetime, after: tuple[dt.datetime, str] | None, limit: int
+    ) -> list[tuple[str, dt.datetime]]:
+        self._store.stale_after.append(after)
+        stale = sorted(
+            (fetched_at, fqn) for fqn, (_, fetched_at) in self._store.counts.items() if fetched_at < fetched_before
+        )
+        return [(fqn, fetched_at) for fetched_at, fqn in stale if after is None or (fetched_at, fqn) > after][:limit]
+
+    async def estimate_count_for_refresh(self, fetched_before: dt.datetime) -> int:
+        missing = sum(x not in self._store.counts for x in self._store.papers)
+        return missing + sum(fetched_at < fetched_before for _, fetched_at in self._store.counts.values())
+
+
+class _FakeDatabase:
+    # replaces both new_database_manager(config) and the manager it yields
+    def __init__(self, store: _FakeCitationStore) -> None:
+        self._store = store
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[_FakeCitationStore, None]:
+        yield self._store
+
+
+def _settings() -> CitationsSettings:
+    return CitationsSettings(
+        database=DatabaseConfig(connection_url="postgresql+asyncpg://unused"),
+        citation_provider=semantic_scholar.SemanticScholarConfig(url="https://s2.invalid", api_key=""),
+        batch_size=_BATCH_SIZE,
+        concurrency=_CONCURRENCY,
+        max_requests_per_second=_MAX_REQUESTS_PER_SECOND,
+        refresh_older_than_seconds=_REFRESH_OLDER_THAN_SECONDS,
+    )
+
+
+def test_refresh_pages_through_missing_and_stale_papers(monkeypatch: pytest.MonkeyPatch) -> None:
+    papers = [f"arxiv/2401.{i:05d}" for i in range(18)]
+    # more missing and more stale papers than one page (batch_size * concurrency) of each
+    missing, stale, fresh = papers[:8], papers[8:15], papers[15:]
+    counts = {fqn: (1, _LONG_AGO + dt.timedelta(seconds=i)) for i, fqn in enumerate(stale)}
+    counts.update((fqn, (1, _NOW)) for fqn in fresh)
+    store = _FakeCitationStore(papers, counts)
+
+    s2 = _FakeSemanticScholar(unknown={"ARXIV:2401.00003"}, malformed={"ARXIV:2401.00014"})
+    monkeypatch.setattr(
+        semantic_scholar, "AsyncClient", functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(s2))
+    )
+    monkeypatch.setattr(engine, "CitationCountRepository", _FakeCitationCountRepository)
+    monkeypatch.setattr(engine, "new_database_manager", lambda _: _FakeDatabase(store))
+
+    asyncio.run(CitationsEngine(_settings()).refresh())
+
+    page_size = _BATCH_SIZE * _CONCURRENCY
+    # keyset paging: every page starts after the last paper of the previous one, until a page comes back empty
+    assert store.missing_after == [None, missing[page_size - 1], missing[-1]]
+    assert store.stale_after == [
+        None,
+        (counts[stale[page_size - 1]][1], stale[page_size - 1]),
+        (counts[stale[-1]][1], stale[-1]),
+    ]
+
+    requested = [x.replace("ARXIV:", "arxiv/") for _, ids in s2.requests for x in ids]
+    # every missing and stale paper is requested exactly once, fresh counts are left alone
+    assert sorted(requested) == sorted(missing + stale)
+
+    # unknown papers are stored as None, the batch with the malformed response keeps its old counts
+    assert store.counts["arxiv/2401.00003"][0] is None
+    failed = next(ids for _, ids in s2.requests if "ARXIV:2401.00014" in ids)
+    for s2_id in failed:
+        fqn = s2_id.replace("ARXIV:", "arxiv/")
+        assert store.counts[fqn] == counts[fqn]
+    refreshed = set(missing + stale) - {x.replace("ARXIV:", "arxiv/") for x in failed}
+    assert all(store.counts[fqn][1] > _NOW for fqn in refreshed)
+    assert all(store.counts[fqn] == counts[fqn] for fqn in fresh)
+
+    # requests are spaced by the rate limit even though two of them may be in flight
+    started = sorted(at for at, _ in s2.requests)
+    assert min(b - a for a, b in itertools.pairwise(started)) >= 1 / _MAX_REQUESTS_PER_SECOND - 5e-3
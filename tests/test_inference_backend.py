@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+import torch
+
+from arxiv_at_home.api.component.reranker.config import RerankerConfig
+from arxiv_at_home.api.component.reranker.factory import (
+    create_rerank_processor,
+    create_rerank_template,
+    create_reranker,
+)
+from arxiv_at_home.common.dense.config import DenseVectorizationConfig, PoolingMode
+from arxiv_at_home.common.dense.factory import create_dense_tokenizer, create_dense_vectorizer
+from arxiv_at_home.common.inference.collate import collate_right_padded
+from arxiv_at_home.common.inference.config import InferenceBackendConfig, InferenceBackendType, ModelDtype
+
+_TOLERANCE = 1e-2
+_QUERIES = ["attention is all you need", "graph neural networks", "a survey on large language models for code"]
+_DOCUMENTS = ["attention is all you need", "molecular property prediction", "code generation"]
+
+
+def _backend(backend_type: InferenceBackendType) -> InferenceBackendConfig:
+    # int8_dynamic runs in float32, so the others do too for a like-for-like comparison
+    return InferenceBackendConfig(type=backend_type, dtype=ModelDtype.float32, parity_tolerance=_TOLERANCE)
+
+
+def _dense_config(model_path: Path, backend_type: InferenceBackendType) -> DenseVectorizationConfig:
+    return DenseVectorizationConfig(
+        device="cpu",
+        model=str(model_path),
+        pooling=PoolingMode.last_token,
+        query_template="instruct: $QUERY",
+        document_template="$DOCUMENT",
+        backend=_backend(backend_type),
+    )
+
+
+def _reranker_config(model_path: Path, backend_type: InferenceBackendType) -> RerankerConfig:
+    return RerankerConfig(
+        device="cpu",
+        model=str(model_path),
+        template="judge whether the document meets the query\n<Query>: $QUERY\n<Document>: $DOCUMENT\nanswer:",
+        token_true="yes",
+        token_false="no",
+        backend=_backend(backend_type),
+    )
+
+
+def _embed(config: DenseVectorizationConfig) -> torch.Tensor:
+    encodings = create_dense_tokenizer(config).encode_batch([f"instruct: {x}" for x in _QUERIES])
+    # the factory raises on its own parity probes if the backend drifts from the eager model
+    with create_dense_vectorizer(config) as vectorizer:
+        return torch.stack(vectorizer(collate_right_padded([x.ids for x in encodings])))
+
+
+def _rerank(config: RerankerConfig) -> list[float]:
+    template = create_rerank_template(config)
+    processor = create_rerank_processor(config)
+    templates = [
+        config.template.replace("$QUERY", query).replace("$DOCUMENT", doc)
+        for query, doc in zip(_QUERIES, _DOCUMENTS, strict=True)
+    ]
+    assert all(x.startswith(template.prefix) for x in templates)
+    with create_reranker(config, processor) as reranker:
+        return reranker(processor.encode(templates))
+
+
+@pytest.mark.parametrize("backend_type", [InferenceBackendType.compile, InferenceBackendType.int8_dynamic])
+def test_dense_vectorizer_backend_matches_eager(tiny_model_path: Path, backend_type: InferenceBackendType) -> None:
+    reference = _embed(_dense_config(tiny_model_path, InferenceBackendType.eager))
+    embeddings = _embed(_dense_config(tiny_model_path, backend_type))
+
+    # embeddings are normalized, so this is the cosine distance
+    assert (1 - (embeddings * reference).sum(dim=1)).max().item() <= _TOLERANCE
+
+
+@pytest.mark.parametrize("backend_type", [InferenceBackendType.compile, InferenceBackendType.int8_dynamic])
+def test_reranker_backend_matches_eager(tiny_model_path: Path, backend_type: InferenceBackendType) -> None:
+    reference = _rerank(_reranker_config(tiny_model_path, InferenceBackendType.eager))
+    scores = _rerank(_reranker_config(tiny_model_path, backend_type))
+
+    assert scores == pytest.approx(reference, abs=_TOLERANCE)
+
+
+def test_onnx_backend_requires_onnx_path(tiny_model_path: Path) -> None:
+    with pytest.raises(ValueError, match="onnx_path"):
+        _dense_config(tiny_model_path, InferenceBackendType.onnx)
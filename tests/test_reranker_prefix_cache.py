@@ -0,0 +1,76 @@
+import pytest
+import torch
+import torch.nn.functional as F  # noqa: N812
+from d9d.dataset import PaddingSide1D, pad_stack_1d
+from tokenizers import Tokenizer
+from transformers import Qwen3ForCausalLM
+
+from arxiv_at_home.api.component.reranker.config import RerankerConfig
+from arxiv_at_home.api.component.reranker.model import GenerativeReranker, RerankInputProcessor
+from arxiv_at_home.api.component.reranker.template import RerankTemplate
+
+_TEMPLATE = "judge whether the document meets the query\n<Query>: $QUERY\n<Document>: $DOCUMENT\nanswer:"
+_PAIRS = [
+    ("attention is all you need", "attention is all you need"),
+    ("graph neural networks for molecules", "a survey on large language models for code generation"),
+    ("code", "graph neural networks for molecules and a survey on attention"),
+]
+
+
+def _config(prefix_cache: bool) -> RerankerConfig:
+    return RerankerConfig(
+        device="cpu",
+        model="tiny",
+        template=_TEMPLATE,
+        token_true="yes",
+        token_false="no",
+        prefix_cache=prefix_cache,
+    )
+
+
+@torch.inference_mode()
+def _baseline_scores(model: Qwen3ForCausalLM, tokenizer: Tokenizer, templates: list[str]) -> list[float]:
+    # whole templates, left-padded, scored from the full vocabulary logits of the last position
+    encodings = [tokenizer.encode(x) for x in templates]
+    input_ids = pad_stack_1d(
+        [torch.tensor(x.ids, dtype=torch.long) for x in encodings], pad_value=0, padding_side=PaddingSide1D.left
+    )
+    attention_mask = pad_stack_1d(
+        [torch.tensor(x.attention_mask, dtype=torch.long) for x in encodings],
+        pad_value=0,
+        padding_side=PaddingSide1D.left,
+    )
+    logits = model(input_ids=input_ids, attention_mask=attention_mask).logits[:, -1, :]
+    answer_logits = logits[:, [tokenizer.token_to_id("no"), tokenizer.token_to_id("yes")]]
+    return F.log_softmax(answer_logits, dim=1)[:, 1].exp().tolist()
+
+
+@pytest.mark.parametrize("prefix_cache", [True, False])
+def test_scores_match_left_padded_baseline(
+    tiny_model: Qwen3ForCausalLM, tiny_tokenizer: Tokenizer, prefix_cache: bool
+) -> None:
+    config = _config(prefix_cache)
+    template = RerankTemplate(config)
+    templates = [_TEMPLATE.replace("$QUERY", query).replace("$DOCUMENT", doc) for query, doc in _PAIRS]
+
+    processor = RerankInputProcessor(tiny_tokenizer, config.device, template_prefix=template.prefix)
+    reranker = GenerativeReranker(config, tiny_model, tiny_tokenizer, prefix_ids=processor.prefix_ids)
+    assert reranker.uses_prefix_cache == prefix_cache
+
+    scores = reranker(processor.encode(templates))
+
+    assert scores == pytest.approx(_baseline_scores(tiny_model, tiny_tokenizer, templates), abs=1e-5)
+
+
+def test_scores_do_not_depend_on_batch_composition(tiny_model: Qwen3ForCausalLM, tiny_tokenizer: Tokenizer) -> None:
+    config = _config(prefix_cache=True)
+    template = RerankTemplate(config)
+    templates = [_TEMPLATE.replace("$QUERY", query).replace("$DOCUMENT", doc) for query, doc in _PAIRS]
+
+    processor = RerankInputProcessor(tiny_tokenizer, config.device, template_prefix=template.prefix)
+    reranker = GenerativeReranker(config, tiny_model, tiny_tokenizer, prefix_ids=processor.prefix_ids)
+
+    batched = reranker(processor.encode(templates))
+    single = [reranker(processor.encode([x]))[0] for x in templates]
+
+    assert batched == pytest.approx(single, abs=1e-5)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from arxiv_at_home.api.service.search import _top_k_indices
+
+
+def test_ties_at_the_cutoff_keep_candidate_order() -> None:
+    scores = np.array([0.5, 0.9, 0.5, 0.5, 0.1, 0.5])
+
+    assert _top_k_indices(scores, np.arange(6), 3).tolist() == [1, 0, 2]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_stable_sort(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    for _ in range(500):
+        # few distinct values, so most cutoffs fall inside a run of ties
+        scores = rng.integers(0, 4, size=40).astype(np.float64)
+        scores[rng.integers(0, 40, size=3)] = -np.inf
+        indices = np.sort(rng.choice(40, size=int(rng.integers(0, 30)), replace=False))
+        k = int(rng.integers(-1, 35))
+
+        expected = indices[np.argsort(-scores[indices], kind="stable")][: max(k, 0)]
+        assert _top_k_indices(scores, indices, k).tolist() == expected.tolist()